@@ -0,0 +1,173 @@
+"""
+========================================================================
+FRAUD DETECTION - PIPELINE BENCHMARK
+========================================================================
+Purpose: Catch performance regressions in clean -> EDA -> model before
+         they reach production volumes
+Method: Generate a synthetic dataset, run every stage as its own process
+        and record wall time, peak RSS and rows/sec per stage
+Baseline: Results are saved as JSON; --baseline compares a run against a
+          stored one and exits non-zero on a regression
+Sections: each stage also writes its section trace (see instrumentation.py),
+          whose per-section wall times are kept with the stage results
+========================================================================
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from instrumentation import TRACE_ENV, section_regressions
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+STAGES = ['generate', 'clean', 'eda', 'model']
+DEFAULT_TOLERANCE = 0.25
+
+
+def run_stage(name, argv, cwd, rows):
+    """Run one stage in a child process; stdout/stderr go to ``<name>.log`` in ``cwd``."""
+    log_path = os.path.join(cwd, f'{name}.log')
+    trace_path = os.path.abspath(os.path.join(cwd, f'{name}.trace.json'))
+    if os.path.exists(trace_path):
+        os.remove(trace_path)
+    env = dict(os.environ, **{TRACE_ENV: trace_path})
+    start = time.perf_counter()
+    with open(log_path, 'w') as log:
+        proc = subprocess.Popen([sys.executable] + argv, cwd=cwd, stdout=log, stderr=subprocess.STDOUT,
+                                env=env)
+        if hasattr(os, 'wait4'):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+        else:
+            proc.wait()
+            peak_rss_mb = None
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"Stage '{name}' failed with exit code {proc.returncode}, see {log_path}")
+    sections = {}
+    if os.path.exists(trace_path):
+        with open(trace_path) as fh:
+            sections = {record['section']: record['wall_s'] for record in json.load(fh)['sections']}
+    return {'wall_s': round(wall, 3),
+            'peak_rss_mb': None if peak_rss_mb is None else round(peak_rss_mb, 1),
+            'rows_per_s': round(rows / wall, 1),
+            'sections': sections}
+
+
+def stage_commands(args):
+    def script(name):
+        return os.path.join(SCRIPTS_DIR, name)
+
+    clean = [script('data_cleaning.py'), '--input', 'messy.csv', '--output', 'cleaned_fraud_data.csv']
+    if args.chunksize:
+        clean += ['--chunksize', str(args.chunksize)]
+    model = [script('model_baseline.py'), '--data', 'cleaned_fraud_data.csv', '--no-cache',
+             '--gb-engine', args.gb_engine]
+    if args.jobs:
+        model += ['--jobs', str(args.jobs)]
+    return {
+        'generate': [script('synthetic_data.py'), '--rows', str(args.rows), '--seed', str(args.seed),
+                     '--output', 'messy.csv'],
+        'clean': clean,
+        'eda': [script('exploratory_analysis.py'), '--data', 'cleaned_fraud_data.csv', '--no-cache'],
+        'model': model,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Rows of (stage, metric, baseline, current, change, regressed) for shared stages.
+
+    Stage wall time and peak RSS are always listed; a section name appears as
+    the metric when that section's wall time regressed.
+    """
+    rows = []
+    for stage, current in results['stages'].items():
+        before = baseline.get('stages', {}).get(stage)
+        if before is None:
+            continue
+        for metric in ['wall_s', 'peak_rss_mb']:
+            old, new = before.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = new / old - 1
+            rows.append((stage, metric, old, new, change, change > tolerance))
+        # Individual sections are only reported when they regress
+        traces = [{'sections': [{'section': name, 'wall_s': wall}
+                                for name, wall in run.get('sections', {}).items()]}
+                  for run in (before, current)]
+        for name, old, new, change in section_regressions(*traces, tolerance=tolerance):
+            rows.append((stage, name, old, new, change, True))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the clean -> EDA -> model pipeline")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--workdir', default='benchmark_run',
+                        help="Where the generated data, outputs and stage logs go")
+    parser.add_argument('--chunksize', type=int, default=None, help="Benchmark streaming cleaning")
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--gb-engine', choices=['exact', 'hist', 'both'], default='exact')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=None, help="Stored results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown / memory growth before failing")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    commands = stage_commands(args)
+
+    results = {
+        'rows': args.rows,
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'stages': {},
+    }
+
+    print(f"\nBenchmarking {args.rows:,} rows in '{args.workdir}'")
+    print("-" * 70)
+    for stage in STAGES:
+        if stage not in args.stages:
+            continue
+        results['stages'][stage] = run_stage(stage, commands[stage], args.workdir, args.rows)
+        stats = results['stages'][stage]
+        rss = 'n/a' if stats['peak_rss_mb'] is None else f"{stats['peak_rss_mb']:,.0f} MB"
+        print(f"  {stage:<10} {stats['wall_s']:>9.2f}s  {rss:>10} peak RSS  "
+              f"{stats['rows_per_s']:>12,.0f} rows/s")
+        if stats['sections']:
+            slowest = max(stats['sections'], key=stats['sections'].get)
+            print(f"  {'':<10} slowest section: {slowest} ({stats['sections'][slowest]:.2f}s)")
+
+    with open(args.output, 'w') as fh:
+        json.dump(results, fh, indent=2)
+    print(f"\nResults saved as '{args.output}'")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        if baseline.get('rows') != args.rows:
+            print(f"Warning: baseline was recorded at {baseline.get('rows'):,} rows")
+
+        print(f"\nComparison with '{args.baseline}' (tolerance {args.tolerance:.0%}):")
+        regressions = 0
+        for stage, metric, old, new, change, regressed in compare(results, baseline, args.tolerance):
+            flag = 'REGRESSION' if regressed else 'ok'
+            print(f"  {stage:<10} {metric:<12} {old:>10.2f} -> {new:>10.2f}  {change:+7.1%}  {flag}")
+            regressions += regressed
+        if regressions:
+            print(f"\n{regressions} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+========================================================================
+FRAUD DETECTION - COLUMNAR STORAGE FOR THE CLEANED DATASET
+========================================================================
+Purpose: Typed, compact loading of the cleaned data (CSV or Parquet)
+Layout: Parquet dataset partitioned by day (time // 86400), hive style
+Requires: pyarrow for the Parquet format (CSV works without it)
+========================================================================
+"""
+
+import hashlib
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+SECONDS_PER_DAY = 86400
+PARTITION_COLUMN = 'day'
+
+# Compact dtypes for the cleaned dataset. The nullable variants keep the
+# storage width (int32 / float32 / bool) while still allowing the missing
+# values that data_cleaning.py tolerates (up to 3 per row).
+CLEAN_DTYPES = {
+    'user_id': 'Int32',
+    'amount': 'Float32',
+    'payment_method': 'category',
+    'category': 'category',
+    'device_id': 'Int32',
+    'time': 'float64',
+    'fraud': 'boolean',
+}
+CLEAN_COLUMNS = list(CLEAN_DTYPES)
+
+FRAUD_TO_BOOL = {'YES': True, 'NO': False}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("The Parquet format requires pyarrow: pip install pyarrow") from exc
+    return pyarrow
+
+
+def is_parquet_path(path):
+    return os.path.isdir(path) or str(path).endswith('.parquet')
+
+
+def to_typed(df):
+    """Convert a cleaned frame (YES/NO labels, inferred dtypes) to CLEAN_DTYPES."""
+    typed = df.copy()
+    if 'fraud' in typed and not pd.api.types.is_bool_dtype(typed['fraud']):
+        typed['fraud'] = typed['fraud'].map(FRAUD_TO_BOOL)
+    for column, dtype in CLEAN_DTYPES.items():
+        if column in typed:
+            typed[column] = typed[column].astype(dtype)
+    return typed
+
+
+def data_fingerprint(*arrays):
+    """SHA-256 over the shapes, dtypes and contents of the given arrays or frames."""
+    digest = hashlib.sha256()
+    for array in arrays:
+        if isinstance(array, (pd.DataFrame, pd.Series)):
+            labels = array.columns if isinstance(array, pd.DataFrame) else array.name
+            digest.update(repr(labels).encode())
+            digest.update(repr(array.dtypes).encode())
+            digest.update(pd.util.hash_pandas_object(array, index=False).to_numpy().tobytes())
+            continue
+        array = np.ascontiguousarray(array)
+        digest.update(f'{array.shape}{array.dtype}'.encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def reset_dataset(root):
+    """Remove a previously written partitioned dataset at ``root``."""
+    if not os.path.isdir(root):
+        return
+    unexpected = [name for name in os.listdir(root) if not name.startswith(PARTITION_COLUMN + '=')]
+    if unexpected:
+        raise ValueError(f"Refusing to overwrite '{root}': not a day-partitioned dataset "
+                         f"(found {unexpected[:3]})")
+    shutil.rmtree(root)
+
+
+def write_parquet(df, root, part=0):
+    """Append ``df`` to the day-partitioned Parquet dataset at ``root``.
+
+    Every call writes new files named after ``part``, so a streaming writer
+    can pass its chunk index and never rewrite earlier output.
+    """
+    pa = _require_pyarrow()
+    typed = to_typed(df)
+    typed[PARTITION_COLUMN] = np.floor_divide(typed['time'], SECONDS_PER_DAY).astype('Int32')
+    table = pa.Table.from_pandas(typed, preserve_index=False)
+    pa.parquet.write_to_dataset(table, root, partition_cols=[PARTITION_COLUMN],
+                                basename_template=f'part-{part:05d}-{{i}}.parquet')
+
+
+def load_cleaned(path='cleaned_fraud_data.csv', columns=None, days=None):
+    """Load the cleaned dataset with compact dtypes.
+
+    ``columns`` restricts the read to the listed columns (only those are
+    decoded, for either format). ``days`` restricts a Parquet read to the
+    given day partitions.
+    """
+    if is_parquet_path(path):
+        pa = _require_pyarrow()
+        dataset = pa.dataset.dataset(
+            path, format='parquet',
+            partitioning=pa.dataset.partitioning(
+                pa.schema([(PARTITION_COLUMN, pa.int32())]), flavor='hive'))
+        row_filter = None
+        if days is not None:
+            row_filter = pa.dataset.field(PARTITION_COLUMN).isin(list(days))
+        read_columns = columns if columns is not None else CLEAN_COLUMNS
+        df = dataset.to_table(columns=read_columns, filter=row_filter).to_pandas()
+    else:
+        if days is not None:
+            raise ValueError("Day filtering needs the Parquet format")
+        dtypes = {c: d for c, d in CLEAN_DTYPES.items() if c != 'fraud' and (columns is None or c in columns)}
+        df = pd.read_csv(path, usecols=columns, dtype=dtypes)
+        if columns is not None:
+            df = df[columns]
+    return to_typed(df)
+
+
+def iter_cleaned(path='cleaned_fraud_data.csv', columns=None, chunksize=250_000):
+    """Yield the cleaned dataset as typed frames of at most ``chunksize`` rows.
+
+    Only one chunk is decoded at a time, so memory is bounded by
+    ``chunksize`` whatever the dataset size.
+    """
+    read_columns = columns if columns is not None else CLEAN_COLUMNS
+    if is_parquet_path(path):
+        pa = _require_pyarrow()
+        dataset = pa.dataset.dataset(
+            path, format='parquet',
+            partitioning=pa.dataset.partitioning(
+                pa.schema([(PARTITION_COLUMN, pa.int32())]), flavor='hive'))
+        for batch in dataset.to_batches(columns=read_columns, batch_size=chunksize):
+            if batch.num_rows:
+                yield to_typed(batch.to_pandas())
+    else:
+        dtypes = {c: d for c, d in CLEAN_DTYPES.items() if c != 'fraud' and c in read_columns}
+        for chunk in pd.read_csv(path, usecols=read_columns, dtype=dtypes, chunksize=chunksize):
+            yield to_typed(chunk[read_columns])
@@ -1,46 +1,152 @@
+"""
+========================================================================
+FRAUD DETECTION - DATA CLEANING
+========================================================================
+Purpose: Deduplicate, drop rows with more than 3 missing values and flag
+         invalid amounts / device IDs in the messy transaction export
+Modes: in memory (default) or streamed in chunks (--chunksize)
+Output: cleaned CSV or day-partitioned Parquet, optional rollup cube
+========================================================================
+"""
+
+import argparse
+
 import pandas as pd
 
-# Load the messy fraud dataset
-df = pd.read_csv(r"C:\Users\gadis\Downloads\messy_synthetic_fraud.csv")
+from instrumentation import add_instrumentation_args, configure, section
+
+
+def build_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Clean the messy fraud dataset")
+    parser.add_argument('--input', default=r"C:\Users\gadis\Downloads\messy_synthetic_fraud.csv")
+    parser.add_argument('--output', default=None,
+                        help="Defaults to cleaned_fraud_data.csv / cleaned_fraud_data.parquet")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help="parquet writes a typed dataset partitioned by day (needs pyarrow)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Stream the input in chunks of this many rows (bounded memory)")
+    parser.add_argument('--cube-db', default=None,
+                        help="Also build the rollup cube and the raw table into this SQLite file "
+                             "(see rollup_cube.py)")
+    return add_instrumentation_args(parser)
+
+
+def clean_streaming(args):
+    """Streaming mode: same rules, applied chunk by chunk, output written incrementally."""
+    from streaming_cleaner import csv_writer, stream_clean
+    writer = csv_writer(args.output)
+    if args.format == 'parquet':
+        from columnar_store import write_parquet
+
+        def writer(cleaned, chunk_index):
+            write_parquet(cleaned, args.output, part=chunk_index)
+    if args.cube_db:
+        # Cubes of disjoint chunks merge exactly, so the cube is built alongside the output
+        from rollup_cube import append_raw, build_cube, merge_cubes, write_sqlite
+        chunk_cubes = []
+        write_chunk = writer
+
+        def writer(cleaned, chunk_index):
+            write_chunk(cleaned, chunk_index)
+            # The raw rows back the user- and device-level SQL reports
+            append_raw(args.cube_db, cleaned, replace=chunk_index == 0)
+            chunk_cubes.append(build_cube(cleaned))
+            if len(chunk_cubes) > 1:
+                chunk_cubes[:] = [merge_cubes(chunk_cubes)]
+    with section('stream clean') as record:
+        summary = stream_clean(args.input, args.output, chunksize=args.chunksize, writer=writer)
+        record['rows'] = summary['rows_out']
+    if args.cube_db and not chunk_cubes:
+        print(f"No rows read from '{args.input}'; rollup cube not written to '{args.cube_db}'")
+    elif args.cube_db:
+        with section('save cube'):
+            write_sqlite(args.cube_db, chunk_cubes[0])
+        print(f"Rollup cube saved to '{args.cube_db}'")
+    print(f"\nCleaned data saved as '{args.output}'")
+
+
+def clean_in_memory(args):
+    """Load the whole input, clean it and save the result; returns the cleaned frame."""
+    # Load the messy fraud dataset
+    with section('load') as record:
+        df = pd.read_csv(args.input)
+
+        # Replace fraud values: convert 0/1 to NO/YES
+        df['fraud'] = df['fraud'].replace({0: 'NO', 1: 'YES'})
+        record['rows'] = len(df)
+
+    # Check for duplicates
+    with section('deduplicate', rows=len(df)):
+        print(f"Duplicates before cleaning: {df.duplicated().sum()}")
+
+        # Remove duplicate rows
+        df = df.drop_duplicates()
+
+        print(f"Duplicates after cleaning: {df.duplicated().sum()}")
+
+    # Check for null values
+    with section('null handling', rows=len(df)):
+        print(f"\nNull values by column:\n{df.isnull().sum()}")
+
+        # Drop rows where there are more than 3 missing values
+        # (keep rows with at most 3 missing values from 7 columns total)
+        df = df.dropna(thresh=len(df.columns) - 3)
+
+    # Data validation: Check for negative values in amount column
+    with section('validation', rows=len(df)):
+        negative_amounts = df[df['amount'] < 0]
+        if len(negative_amounts) > 0:
+            print(f"\nWarning: Found {len(negative_amounts)} rows with negative amounts")
+            print(negative_amounts)
 
-# Replace fraud values: convert 0/1 to NO/YES
-df['fraud'] = df['fraud'].replace({0: 'NO', 1: 'YES'})
+        # Data validation: Check for negative values in device_id
+        negative_devices = df[df['device_id'] < 0]
+        if len(negative_devices) > 0:
+            print(f"\nWarning: Found {len(negative_devices)} rows with negative device IDs")
 
-# Check for duplicates
-print(f"Duplicates before cleaning: {df.duplicated().sum()}")
+    # Display first few rows
+    with section('summary', rows=len(df)):
+        print(f"\nCleaned dataset shape: {df.shape}")
+        print(f"\nFirst few rows:")
+        print(df.head())
 
-# Remove duplicate rows
-df = df.drop_duplicates()
+        # Display time column info
+        print(f"\nTime column statistics:")
+        print(df['time'].describe())
 
-print(f"Duplicates after cleaning: {df.duplicated().sum()}")
+    # Save cleaned data
+    with section('save', rows=len(df)):
+        if args.format == 'parquet':
+            from columnar_store import write_parquet
+            write_parquet(df, args.output)
+        else:
+            df.to_csv(args.output, index=False)
+        print(f"\nCleaned data saved as '{args.output}'")
 
-# Check for null values
-print(f"\nNull values by column:\n{df.isnull().sum()}")
+    if args.cube_db:
+        with section('build cube', rows=len(df)):
+            from rollup_cube import build_cube, write_sqlite
+            # With the raw rows, which the user- and device-level SQL reports read
+            write_sqlite(args.cube_db, build_cube(df), df)
+        print(f"Rollup cube saved to '{args.cube_db}'")
+    return df
 
-# Drop rows where there are more than 3 missing values
-# (keep rows with at most 3 missing values from 7 columns total)
-df = df.dropna(thresh=len(df.columns) - 3)
 
-# Data validation: Check for negative values in amount column
-negative_amounts = df[df['amount'] < 0]
-if len(negative_amounts) > 0:
-    print(f"\nWarning: Found {len(negative_amounts)} rows with negative amounts")
-    print(negative_amounts)
+def main(argv=None, prog=None):
+    args = build_parser(prog).parse_args(argv)
+    configure('data_cleaning', args.trace, args.profile)
+    if args.output is None:
+        args.output = f'cleaned_fraud_data.{args.format}'
 
-# Data validation: Check for negative values in device_id
-negative_devices = df[df['device_id'] < 0]
-if len(negative_devices) > 0:
-    print(f"\nWarning: Found {len(negative_devices)} rows with negative device IDs")
+    if args.format == 'parquet':
+        from columnar_store import reset_dataset
+        reset_dataset(args.output)
 
-# Display first few rows
-print(f"\nCleaned dataset shape: {df.shape}")
-print(f"\nFirst few rows:")
-print(df.head())
+    if args.chunksize:
+        clean_streaming(args)
+    else:
+        clean_in_memory(args)
 
-# Display time column info
-print(f"\nTime column statistics:")
-print(df['time'].describe())
 
-# Save cleaned data
-df.to_csv('cleaned_fraud_data.csv', index=False)
-print("\nCleaned data saved as 'cleaned_fraud_data.csv'")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,359 @@
+"""
+========================================================================
+FRAUD DETECTION - FEATURE & SCORE DRIFT MONITOR
+========================================================================
+Purpose: Detect when live transactions stop looking like the training
+         data (amount, time_hour, payment_method, category) or the model's
+         score distribution moves
+Reference: Fixed-size histograms snapshotted at training time - quantile
+           bins for amount and score, one bin per hour, one per known
+           category, plus missing / unseen-category bins (JSON)
+Window: Sliding window of the last N transactions kept as a ring of pane
+        histograms, so memory is panes x bins no matter the traffic and
+        no raw history is held
+Statistics: PSI and the two-sample KS statistic (on the bin edges) per
+            feature; PSI >= 0.25 alerts, PSI >= 0.1 or a significant
+            (p < 0.01) KS distance of at least 0.1 warns
+Usage: python drift_monitor.py reference --data train.csv --artifact model.joblib
+       python drift_monitor.py replay --data new_batch.csv --artifact model.joblib
+       python scoring.py --monitor drift_reference.json stdin
+========================================================================
+"""
+
+import argparse
+import bisect
+import json
+import math
+import os
+from collections import deque
+
+import numpy as np
+
+DEFAULT_REFERENCE = 'drift_reference.json'
+DEFAULT_BINS = 20
+DEFAULT_WINDOW = 10_000
+DEFAULT_PANES = 10
+PSI_WARN = 0.1
+PSI_ALERT = 0.25
+KS_ALPHA = 0.01
+KS_MIN_EFFECT = 0.1  # large windows make tiny KS distances significant
+PSI_FLOOR = 1e-4  # proportion used for empty bins, so PSI stays finite
+
+# Monitored feature -> binning: quantile edges, one bin per hour, or labels
+MONITORED_FEATURES = {'amount': 'quantile', 'time_hour': 'hour', 'payment_method': 'categorical',
+                      'category': 'categorical', 'score': 'quantile'}
+STATUS_ORDER = {'ok': 0, 'warn': 1, 'alert': 2}
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def feature_value(name, transaction, score=None):
+    """Value of a monitored feature for one raw transaction dict."""
+    if name == 'score':
+        return score
+    if name == 'time_hour':
+        t = transaction.get('time')
+        return None if _is_missing(t) else (float(t) // 3600) % 24
+    return transaction.get(name)
+
+
+def feature_values(name, df, scores=None):
+    """Values of a monitored feature for a frame of raw transactions."""
+    if name == 'score':
+        return scores
+    if name == 'time_hour':
+        return (df['time'].to_numpy(dtype=np.float64, na_value=np.nan) // 3600) % 24
+    return df[name]
+
+
+class FeatureHistogram:
+    """Fixed bins for one feature, in the order regular bins, (other), (missing).
+
+    Numeric features have ``edges`` (bin i holds edges[i-1] <= x < edges[i]);
+    categorical features have ``labels`` plus an (other) bin for unseen ones.
+    """
+
+    def __init__(self, name, edges=None, labels=None, counts=None):
+        self.name = name
+        self.edges = None if edges is None else [float(edge) for edge in edges]
+        self.labels = None if labels is None else [str(label) for label in labels]
+        self._codes = None if labels is None else {label: code for code, label in enumerate(self.labels)}
+        self.counts = np.zeros(self.n_bins, dtype=np.int64) if counts is None else np.asarray(counts, np.int64)
+
+    @property
+    def categorical(self):
+        return self.labels is not None
+
+    @property
+    def n_bins(self):
+        return len(self.labels) + 2 if self.categorical else len(self.edges) + 2
+
+    @property
+    def missing_bin(self):
+        return self.n_bins - 1
+
+    @classmethod
+    def fit(cls, name, values, kind, bins=DEFAULT_BINS):
+        """Reference histogram of ``values`` (a Series or array) with ``kind`` binning."""
+        import pandas as pd
+
+        values = pd.Series(values).reset_index(drop=True)
+        if kind == 'categorical':
+            observed = values.dropna().astype(str)
+            hist = cls(name, labels=sorted(observed.unique()))
+        elif kind == 'hour':
+            hist = cls(name, edges=range(1, 24))
+        else:
+            numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            numbers = numbers[~np.isnan(numbers)]
+            edges = np.quantile(numbers, np.linspace(0, 1, bins + 1)[1:-1]) if len(numbers) else []
+            hist = cls(name, edges=np.unique(edges))
+        hist.counts = np.bincount(hist.bins(values), minlength=hist.n_bins)
+        return hist
+
+    def bin(self, value):
+        """Bin of one value; the single-transaction path (no NumPy / pandas)."""
+        if _is_missing(value):
+            return self.missing_bin
+        if self.categorical:
+            return self._codes.get(str(value), len(self.labels))
+        return bisect.bisect_right(self.edges, float(value))
+
+    def bins(self, values):
+        """Bins of a Series or array of values."""
+        import pandas as pd
+
+        values = pd.Series(values).reset_index(drop=True)
+        missing = values.isna().to_numpy()
+        if self.categorical:
+            labels = values.astype(object).where(~missing).map(str, na_action='ignore')
+            codes = pd.Index(self.labels).get_indexer(labels).astype(np.int64)
+            codes[codes < 0] = len(self.labels)
+        else:
+            numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            codes = np.searchsorted(np.asarray(self.edges), numbers, side='right').astype(np.int64)
+        codes[missing] = self.missing_bin
+        return codes
+
+    def bin_label(self, index):
+        if index == self.missing_bin:
+            return '(missing)'
+        if self.categorical:
+            return self.labels[index] if index < len(self.labels) else '(other)'
+        low = self.edges[index - 1] if index > 0 else -math.inf
+        high = self.edges[index] if index < len(self.edges) else math.inf
+        return f"[{low:.4g}, {high:.4g})"
+
+    def to_dict(self):
+        return {'name': self.name, 'edges': self.edges, 'labels': self.labels, 'counts': self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['name'], state['edges'], state['labels'], state['counts'])
+
+
+def psi(expected, actual):
+    """Population stability index between two count vectors over the same bins."""
+    expected = np.maximum(np.asarray(expected, dtype=np.float64) / max(np.sum(expected), 1), PSI_FLOOR)
+    actual = np.maximum(np.asarray(actual, dtype=np.float64) / max(np.sum(actual), 1), PSI_FLOOR)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def binned_ks(expected, actual):
+    """KS statistic and asymptotic p-value from two histograms over the same ordered bins.
+
+    The CDFs are only compared at the bin edges, so the statistic is a lower
+    bound of the exact two-sample KS; finer reference bins tighten it.
+    """
+    n, m = np.sum(expected), np.sum(actual)
+    if n == 0 or m == 0:
+        return math.nan, math.nan
+    statistic = float(np.max(np.abs(np.cumsum(expected) / n - np.cumsum(actual) / m)))
+    from scipy.special import kolmogorov
+
+    effective = n * m / (n + m)
+    return statistic, float(kolmogorov(math.sqrt(effective) * statistic))
+
+
+class DriftReference:
+    """Reference histograms for the monitored features."""
+
+    def __init__(self, histograms, rows=0):
+        self.histograms = histograms
+        self.rows = rows
+
+    @classmethod
+    def build(cls, df, scores=None, bins=DEFAULT_BINS):
+        """Reference from raw training transactions and, optionally, model scores.
+
+        ``scores`` need not align with ``df``: held-out scores are a better
+        reference than scores on rows the model was fitted to.
+        """
+        histograms = {}
+        for name, kind in MONITORED_FEATURES.items():
+            if name == 'score' and scores is None:
+                continue
+            histograms[name] = FeatureHistogram.fit(name, feature_values(name, df, scores), kind, bins)
+        return cls(histograms, rows=len(df))
+
+    def save(self, path=DEFAULT_REFERENCE):
+        state = {'rows': self.rows, 'histograms': [hist.to_dict() for hist in self.histograms.values()]}
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as fh:
+            json.dump(state, fh)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_REFERENCE):
+        with open(path) as fh:
+            saved = json.load(fh)
+        histograms = [FeatureHistogram.from_dict(state) for state in saved['histograms']]
+        return cls({hist.name: hist for hist in histograms}, saved['rows'])
+
+
+class DriftMonitor:
+    """Sliding-window drift statistics against a DriftReference.
+
+    The window is the last ``panes`` completed panes of ``window / panes``
+    transactions each; every pane is one flat count vector over all
+    features' bins, and the window total is kept as a running sum, so an
+    update is O(features) and a report O(bins). The (missing) bin is part
+    of PSI but not of KS; categorical features get PSI only.
+    """
+
+    def __init__(self, reference, window=DEFAULT_WINDOW, panes=DEFAULT_PANES,
+                 psi_warn=PSI_WARN, psi_alert=PSI_ALERT, ks_alpha=KS_ALPHA, ks_min_effect=KS_MIN_EFFECT):
+        self.reference = reference
+        self.pane_size = max(1, math.ceil(window / panes))
+        self.psi_warn, self.psi_alert = psi_warn, psi_alert
+        self.ks_alpha, self.ks_min_effect = ks_alpha, ks_min_effect
+        self.features = list(reference.histograms.values())
+        self._offsets = np.cumsum([0] + [hist.n_bins for hist in self.features])
+        self._panes = deque(maxlen=panes)
+        self._window = np.zeros(self._offsets[-1], dtype=np.int64)
+        self._current = [0] * self._offsets[-1]
+        self._in_current = 0
+        self.seen = 0
+
+    @property
+    def window_rows(self):
+        return len(self._panes) * self.pane_size
+
+    def update(self, transaction, score=None):
+        """Count one transaction dict; returns the report when this closes a pane, else None."""
+        current = self._current
+        for hist, offset in zip(self.features, self._offsets):
+            if hist.name == 'score' and score is None:
+                continue
+            current[offset + hist.bin(feature_value(hist.name, transaction, score))] += 1
+        self._in_current += 1
+        self.seen += 1
+        if self._in_current == self.pane_size:
+            self._close_pane(np.asarray(current, dtype=np.int64))
+            return self.report()
+        return None
+
+    def update_batch(self, df, scores=None):
+        """Count a frame of transactions in order; returns one report per pane closed."""
+        n = len(df)
+        if scores is not None:
+            scores = np.asarray(scores, dtype=np.float64)
+        flat = np.empty((n, len(self.features)), dtype=np.int64)
+        for j, (hist, offset) in enumerate(zip(self.features, self._offsets)):
+            if hist.name == 'score' and scores is None:
+                flat[:, j] = -1
+            else:
+                flat[:, j] = offset + hist.bins(feature_values(hist.name, df, scores))
+
+        reports = []
+        start = 0
+        while start < n:
+            stop = min(n, start + self.pane_size - self._in_current)
+            block = flat[start:stop].ravel()
+            counts = np.bincount(block[block >= 0], minlength=len(self._window))
+            self._current = (np.asarray(self._current, dtype=np.int64) + counts).tolist()
+            self._in_current += stop - start
+            self.seen += stop - start
+            start = stop
+            if self._in_current == self.pane_size:
+                self._close_pane(np.asarray(self._current, dtype=np.int64))
+                reports.append(self.report())
+        return reports
+
+    def _close_pane(self, counts):
+        if len(self._panes) == self._panes.maxlen:
+            self._window -= self._panes[0]
+        self._panes.append(counts)
+        self._window += counts
+        self._current = [0] * len(self._window)
+        self._in_current = 0
+
+    def report(self):
+        """One row per feature for the current window, worst first."""
+        rows = []
+        for hist, start, stop in zip(self.features, self._offsets[:-1], self._offsets[1:]):
+            expected, actual = hist.counts, self._window[start:stop]
+            if actual.sum() == 0:
+                continue
+            value = psi(expected, actual)
+            ks, p_value = (math.nan, math.nan) if hist.categorical else binned_ks(expected[:-1], actual[:-1])
+            ks_drift = p_value < self.ks_alpha and ks >= self.ks_min_effect
+            status = 'alert' if value >= self.psi_alert else 'warn' if value >= self.psi_warn or ks_drift else 'ok'
+            shares = actual / max(actual.sum(), 1) - expected / max(expected.sum(), 1)
+            moved = int(np.argmax(np.abs(shares)))
+            rows.append({'feature': hist.name, 'rows': int(actual.sum()), 'psi': value, 'ks': ks,
+                         'ks_p': p_value, 'status': status, 'largest_shift': hist.bin_label(moved),
+                         'shift_pct': float(shares[moved] * 100)})
+        rows.sort(key=lambda row: (-STATUS_ORDER[row['status']], -row['psi']))
+        return {'transactions': self.seen, 'window': self.window_rows, 'features': rows,
+                'status': rows[0]['status'] if rows else 'ok'}
+
+
+def format_report(report):
+    lines = [f"Drift over the last {report['window']:,} of {report['transactions']:,} transactions: "
+             f"{report['status'].upper()}"]
+    for row in report['features']:
+        ks = '' if math.isnan(row['ks']) else f"  KS {row['ks']:.3f} (p={row['ks_p']:.2g})"
+        lines.append(f"  {row['status']:<5} {row['feature']:<15} PSI {row['psi']:.3f}{ks}"
+                     f"  largest shift {row['largest_shift']} {row['shift_pct']:+.1f} pts")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    from columnar_store import load_cleaned
+    from scoring import RAW_COLUMNS, load_artifact
+
+    parser = argparse.ArgumentParser(description="Drift reference snapshots and windowed drift reports")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    ref_parser = subparsers.add_parser('reference', help="Snapshot reference histograms")
+    ref_parser.add_argument('--bins', type=int, default=DEFAULT_BINS)
+    replay_parser = subparsers.add_parser('replay', help="Stream a file through the monitor in time order")
+    replay_parser.add_argument('--window', type=int, default=DEFAULT_WINDOW)
+    replay_parser.add_argument('--panes', type=int, default=DEFAULT_PANES)
+    replay_parser.add_argument('--all', action='store_true', help="Print every window, not only drifted ones")
+    for sub in (ref_parser, replay_parser):
+        sub.add_argument('--data', default='cleaned_fraud_data.csv')
+        sub.add_argument('--artifact', default=None, help="Scoring artifact, to also monitor the scores")
+        sub.add_argument('--reference', default=DEFAULT_REFERENCE)
+    args = parser.parse_args()
+
+    df = load_cleaned(args.data, columns=RAW_COLUMNS)
+    scores = load_artifact(args.artifact).score_batch(df) if args.artifact else None
+    if args.command == 'reference':
+        reference = DriftReference.build(df, scores, args.bins)
+        reference.save(args.reference)
+        print(f"Reference histograms for {', '.join(reference.histograms)} ({len(df):,} rows) "
+              f"saved as '{args.reference}'")
+    else:
+        order = np.argsort(df['time'].to_numpy(dtype=np.float64, na_value=np.inf), kind='stable')
+        df = df.iloc[order]
+        scores = None if scores is None else scores[order]
+        monitor = DriftMonitor(DriftReference.load(args.reference), args.window, args.panes)
+        reports = monitor.update_batch(df, scores)
+        for report in reports:
+            if args.all or report['status'] != 'ok':
+                print(format_report(report) + '\n')
+        drifted = sum(report['status'] != 'ok' for report in reports)
+        print(f"{len(reports):,} window report(s) over {monitor.seen:,} transactions, {drifted:,} with drift")
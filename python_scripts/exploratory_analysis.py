@@ -1,11 +1,3 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import chi2_contingency, pointbiserialr
-import warnings
-warnings.filterwarnings('ignore')
-
 """
 ========================================================================
 FRAUD DETECTION - EXPLORATORY DATA ANALYSIS (EDA)
@@ -17,201 +9,414 @@ Output: Statistical summaries, visualizations, and insights
 ========================================================================
 """
 
-# Load cleaned data
-df = pd.read_csv('cleaned_fraud_data.csv')
-
-print("\n" + "="*70)
-print("FRAUD DETECTION EDA - STATISTICAL ANALYSIS")
-print("="*70)
-
-# ======================== SECTION 1: DATA OVERVIEW ========================
-print("\n[1] DATASET OVERVIEW")
-print("-" * 70)
-print(f"Dataset Shape: {df.shape}")
-print(f"\nColumns: {df.columns.tolist()}")
-print(f"\nData Types:\n{df.dtypes}")
-print(f"\nMissing Values:\n{df.isnull().sum()}")
-
-# ======================== SECTION 2: CLASS IMBALANCE ANALYSIS ========================
-print("\n[2] CLASS IMBALANCE & FRAUD RATE ANALYSIS")
-print("-" * 70)
-fraud_distribution = df['fraud'].value_counts()
-fraud_percentages = df['fraud'].value_counts(normalize=True) * 100
-
-print(f"Fraud Distribution:")
-for fraud_type in ['NO', 'YES']:
-    count = fraud_distribution.get(fraud_type, 0)
-    pct = fraud_percentages.get(fraud_type, 0)
-    print(f"  {fraud_type}: {count:,} transactions ({pct:.2f}%)")
-
-fraud_ratio = fraud_distribution.get('YES', 0) / fraud_distribution.get('NO', 0)
-print(f"\nFraud Ratio (Fraud:Legitimate): 1:{fraud_ratio:.2f}")
-print(f"Imbalance Level: {'SEVERE' if fraud_ratio < 0.15 else 'MODERATE' if fraud_ratio < 0.25 else 'BALANCED'}")
-
-# ======================== SECTION 3: TRANSACTION AMOUNT ANALYSIS ========================
-print("\n[3] TRANSACTION AMOUNT STATISTICAL ANALYSIS")
-print("-" * 70)
-for fraud_status in ['NO', 'YES']:
-    fraud_data = df[df['fraud'] == fraud_status]['amount']
-    print(f"\n{fraud_status} (Legitimate):" if fraud_status == 'NO' else f"\n{fraud_status} (Fraudulent):")
-    print(f"  Count: {len(fraud_data):,}")
-    print(f"  Mean: ${fraud_data.mean():.2f}")
-    print(f"  Median: ${fraud_data.median():.2f}")
-    print(f"  Std Dev: ${fraud_data.std():.2f}")
-    print(f"  Min: ${fraud_data.min():.2f}")
-    print(f"  Max: ${fraud_data.max():.2f}")
-    print(f"  Q1: ${fraud_data.quantile(0.25):.2f}")
-    print(f"  Q3: ${fraud_data.quantile(0.75):.2f}")
-    print(f"  IQR: ${fraud_data.quantile(0.75) - fraud_data.quantile(0.25):.2f}")
-
-# Fraud vs Legitimate comparison
-fraud_mean = df[df['fraud'] == 'YES']['amount'].mean()
-legit_mean = df[df['fraud'] == 'NO']['amount'].mean()
-mean_ratio = fraud_mean / legit_mean
-print(f"\nMean Value Ratio (Fraud:Legitimate): {mean_ratio:.2f}x")
-print(f"Insight: Fraudulent transactions are {mean_ratio:.2f}x higher in value")
-
-# ======================== SECTION 4: PAYMENT METHOD RISK MATRIX ========================
-print("\n[4] PAYMENT METHOD RISK ANALYSIS")
-print("-" * 70)
-payment_method_analysis = df.groupby('payment_method').agg({
-    'fraud': ['count', lambda x: (x == 'YES').sum(), lambda x: (x == 'YES').sum() / len(x) * 100],
-    'amount': ['mean', 'sum']
-}).round(2)
-
-payment_method_analysis.columns = ['Total_Transactions', 'Fraud_Count', 'Fraud_Rate_%', 'Avg_Amount', 'Total_Amount']
-payment_method_analysis = payment_method_analysis.sort_values('Fraud_Rate_%', ascending=False)
-
-print("\nPayment Method Risk Profile:")
-print(payment_method_analysis.to_string())
-
-# ======================== SECTION 5: PRODUCT CATEGORY ANALYSIS ========================
-print("\n[5] PRODUCT CATEGORY FRAUD ANALYSIS")
-print("-" * 70)
-category_analysis = df.groupby('category').agg({
-    'fraud': ['count', lambda x: (x == 'YES').sum(), lambda x: (x == 'YES').sum() / len(x) * 100],
-    'amount': ['mean', 'sum']
-}).round(2)
-
-category_analysis.columns = ['Total_Transactions', 'Fraud_Count', 'Fraud_Rate_%', 'Avg_Amount', 'Total_Fraud_Amount']
-category_analysis = category_analysis.sort_values('Fraud_Count', ascending=False)
-
-print("\nCategory Fraud Risk Profile:")
-print(category_analysis.to_string())
-
-# ======================== SECTION 6: USER CONCENTRATION ANALYSIS ========================
-print("\n[6] USER CONCENTRATION & RISK PROFILING")
-print("-" * 70)
-user_fraud = df[df['fraud'] == 'YES'].groupby('user_id').size()
-user_fraud_sorted = user_fraud.sort_values(ascending=False)
-
-print(f"\nTotal Unique Users: {df['user_id'].nunique():,}")
-print(f"Users with Fraud: {len(user_fraud_sorted):,}")
-print(f"\nTop 10 Fraudulent Users (by incident count):")
-for idx, (user, count) in enumerate(user_fraud_sorted.head(10).items(), 1):
-    fraud_transactions = df[(df['user_id'] == user) & (df['fraud'] == 'YES')]
-    fraud_amount = fraud_transactions['amount'].sum()
-    user_total = df[df['user_id'] == user].shape[0]
-    fraud_rate = count / user_total * 100
-    print(f"  {idx}. User {user}: {count} frauds (${fraud_amount:.2f}), {fraud_rate:.1f}% fraud rate out of {user_total} transactions")
-
-print(f"\nFraud Concentration:")
-top_10_fraud_pct = (user_fraud_sorted.head(10).sum() / user_fraud_sorted.sum() * 100)
-print(f"  Top 10 users account for {top_10_fraud_pct:.1f}% of all fraud incidents")
-
-# ======================== SECTION 7: TEMPORAL PATTERNS ========================
-print("\n[7] TEMPORAL PATTERN ANALYSIS")
-print("-" * 70)
-hour_analysis = df.copy()
-hour_analysis['hour'] = hour_analysis['time'].apply(lambda x: int(x // 3600) % 24)
-
-hourly_fraud = hour_analysis.groupby('hour').agg({
-    'fraud': ['count', lambda x: (x == 'YES').sum(), lambda x: (x == 'YES').sum() / len(x) * 100 if len(x) > 0 else 0]
-}).round(2)
-
-hourly_fraud.columns = ['Total_Transactions', 'Fraud_Count', 'Fraud_Rate_%']
-print("\nHourly Fraud Pattern (Top 5 High-Risk Hours):")
-print(hourly_fraud.sort_values('Fraud_Rate_%', ascending=False).head(5).to_string())
-
-peak_hour = hourly_fraud['Fraud_Count'].idxmax()
-print(f"\nPeak Fraud Hour: {peak_hour}:00 (UTC) with {hourly_fraud.loc[peak_hour, 'Fraud_Count']:.0f} incidents")
-
-# ======================== SECTION 8: DEVICE ANALYSIS ========================
-print("\n[8] DEVICE FINGERPRINTING & RISK ASSESSMENT")
-print("-" * 70)
-device_analysis = df.groupby('device_id').agg({
-    'fraud': ['count', lambda x: (x == 'YES').sum(), lambda x: (x == 'YES').sum() / len(x) * 100],
-    'amount': 'mean',
-    'user_id': 'nunique'
-}).round(2)
-
-device_analysis.columns = ['Total_Transactions', 'Fraud_Count', 'Fraud_Rate_%', 'Avg_Amount', 'Unique_Users']
-device_analysis = device_analysis[device_analysis['Fraud_Count'] > 0].sort_values('Fraud_Count', ascending=False)
-
-print(f"\nTotal Devices: {df['device_id'].nunique():,}")
-print(f"Devices with Fraud: {len(device_analysis):,}")
-print("\nTop 10 Suspicious Devices:")
-print(device_analysis.head(10).to_string())
-
-# ======================== SECTION 9: CORRELATION & STATISTICAL TESTS ========================
-print("\n[9] STATISTICAL CORRELATION ANALYSIS")
-print("-" * 70)
-
-# Convert fraud to numeric for correlation
-df_numeric = df.copy()
-df_numeric['fraud_numeric'] = (df_numeric['fraud'] == 'YES').astype(int)
-
-# Correlation with fraud
-correlations = {}
-for col in ['amount', 'device_id', 'time']:
-    corr, p_value = pointbiserialr(df_numeric['fraud_numeric'], df_numeric[col])
-    correlations[col] = {'correlation': corr, 'p_value': p_value}
-
-print("\nPoint-Biserial Correlations with Fraud:")
-for col, stats in correlations.items():
-    print(f"  {col}: r={stats['correlation']:.4f}, p-value={stats['p_value']:.6f} {'***' if stats['p_value'] < 0.001 else '**' if stats['p_value'] < 0.01 else '*' if stats['p_value'] < 0.05 else 'ns'}")
-
-print("\n*** p < 0.001 (highly significant)")
-print("** p < 0.01 (very significant)")
-print("* p < 0.05 (significant)")
-print("ns = not significant")
-
-# ======================== SECTION 10: KEY FINDINGS & RECOMMENDATIONS ========================
-print("\n[10] SENIOR-LEVEL INSIGHTS & RECOMMENDATIONS")
-print("-" * 70)
-
-findings = [
-    f"\n1. CLASS IMBALANCE: {fraud_percentages.get('YES', 0):.2f}% fraud rate indicates severe imbalance",
-    f"   → Recommendation: Use stratified sampling and weighted models",
+import argparse
+import json
+import os
+import sys
+import warnings
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import data_fingerprint, load_cleaned
+from instrumentation import add_instrumentation_args, configure, get_tracer, section
+from rollup_cube import build_cube, cube_report
+from segment_risk import SEGMENT_COLUMNS, fraud_flags, segment_risk
+from task_graph import DEFAULT_CACHE_DIR, ResultCache, Task, run_tasks
+from user_profiling import top_k, user_profiles
+
+
+def build_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Fraud detection EDA")
+    parser.add_argument('--data', default='cleaned_fraud_data.csv',
+                        help="Cleaned CSV file or day-partitioned Parquet dataset")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Sections run at once (default: one per CPU)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="Section result cache, keyed by data fingerprint and section code")
+    parser.add_argument('--no-cache', action='store_true', help="Recompute every section")
+    parser.add_argument('--results', default=None, metavar='DIR',
+                        help="Also write the sections' results as JSON (and Parquet tables with pyarrow)")
+    return add_instrumentation_args(parser)
+
+
+def load(path):
+    """Cleaned data, typed: fraud is boolean, categoricals for payment_method/category."""
+    with section('load') as record:
+        df = load_cleaned(path, columns=['user_id', 'amount', 'payment_method', 'category',
+                                         'device_id', 'time', 'fraud'])
+        # Amounts are stored as float32; aggregate them in double precision
+        df['amount'] = df['amount'].astype('float64')
+        record['rows'] = len(df)
+    return df
+
+
+# ======================== SECTION TASKS ========================
+# Each section is a task of the report's dependency graph: it gets the data
+# (df, is_fraud, is_legit) and the results of the sections it depends on,
+# prints its text and returns its results. Edits to a section or to the
+# modules it imports (segment_risk, rollup_cube, significance, ...) recompute
+# it; bump its version in SECTION_TASKS after changing a constant of this
+# file it uses, or to force a recompute without a code change.
+
+def _cube(data, deps):
+    # Built once; the payment method, category and hourly tables re-aggregate it
+    with section('build cube', rows=len(data.df)):
+        return {'cube': build_cube(data.df)}
+
+
+def _overview(data, deps):
+    df = data.df
+    with section('[1] DATASET OVERVIEW', rows=len(df)):
+        print("\n[1] DATASET OVERVIEW")
+        print("-" * 70)
+        missing = df.isnull().sum()
+        print(f"Dataset Shape: {df.shape}")
+        print(f"\nColumns: {df.columns.tolist()}")
+        print(f"\nData Types:\n{df.dtypes}")
+        print(f"\nMissing Values:\n{missing}")
+    return {'shape': list(df.shape), 'dtypes': df.dtypes.astype(str), 'missing_values': missing}
+
+
+def _class_imbalance(data, deps):
+    df = data.df
+    with section('[2] CLASS IMBALANCE & FRAUD RATE ANALYSIS', rows=len(df)):
+        print("\n[2] CLASS IMBALANCE & FRAUD RATE ANALYSIS")
+        print("-" * 70)
+        fraud_labels = df['fraud'].map({True: 'YES', False: 'NO'})
+        fraud_distribution = fraud_labels.value_counts()
+        fraud_percentages = fraud_labels.value_counts(normalize=True) * 100
+
+        print(f"Fraud Distribution:")
+        for fraud_type in ['NO', 'YES']:
+            count = fraud_distribution.get(fraud_type, 0)
+            pct = fraud_percentages.get(fraud_type, 0)
+            print(f"  {fraud_type}: {count:,} transactions ({pct:.2f}%)")
+
+        fraud_ratio = fraud_distribution.get('YES', 0) / fraud_distribution.get('NO', 0)
+        imbalance = 'SEVERE' if fraud_ratio < 0.15 else 'MODERATE' if fraud_ratio < 0.25 else 'BALANCED'
+        print(f"\nFraud Ratio (Fraud:Legitimate): 1:{fraud_ratio:.2f}")
+        print(f"Imbalance Level: {imbalance}")
+    return {'fraud_distribution': fraud_distribution, 'fraud_percentages': fraud_percentages,
+            'fraud_ratio': fraud_ratio, 'imbalance_level': imbalance}
+
+
+def _amounts(data, deps):
+    df = data.df
+    with section('[3] TRANSACTION AMOUNT STATISTICAL ANALYSIS', rows=len(df)):
+        print("\n[3] TRANSACTION AMOUNT STATISTICAL ANALYSIS")
+        print("-" * 70)
+        amount_stats = {}
+        for fraud_status, status_mask in [('NO', data.is_legit), ('YES', data.is_fraud)]:
+            fraud_data = df.loc[status_mask, 'amount']
+            stats = amount_stats[fraud_status] = {
+                'Count': len(fraud_data), 'Mean': fraud_data.mean(), 'Median': fraud_data.median(),
+                'Std Dev': fraud_data.std(), 'Min': fraud_data.min(), 'Max': fraud_data.max(),
+                'Q1': fraud_data.quantile(0.25), 'Q3': fraud_data.quantile(0.75),
+            }
+            stats['IQR'] = stats['Q3'] - stats['Q1']
+            print(f"\n{fraud_status} (Legitimate):" if fraud_status == 'NO' else f"\n{fraud_status} (Fraudulent):")
+            print(f"  Count: {stats['Count']:,}")
+            for name in ['Mean', 'Median', 'Std Dev', 'Min', 'Max', 'Q1', 'Q3', 'IQR']:
+                print(f"  {name}: ${stats[name]:.2f}")
+
+        # Fraud vs Legitimate comparison
+        fraud_mean = amount_stats['YES']['Mean']
+        legit_mean = amount_stats['NO']['Mean']
+        mean_ratio = fraud_mean / legit_mean
+        print(f"\nMean Value Ratio (Fraud:Legitimate): {mean_ratio:.2f}x")
+        print(f"Insight: Fraudulent transactions are {mean_ratio:.2f}x higher in value")
+    return {'amount_stats': pd.DataFrame(amount_stats).T.rename_axis('Fraud'), 'fraud_mean': fraud_mean,
+            'legit_mean': legit_mean, 'mean_ratio': mean_ratio}
+
+
+def _payment_methods(data, deps):
+    with section('[4] PAYMENT METHOD RISK ANALYSIS', rows=len(data.df)):
+        print("\n[4] PAYMENT METHOD RISK ANALYSIS")
+        print("-" * 70)
+        payment_method_analysis = cube_report(deps['cube']['cube'], 'payment_method')[SEGMENT_COLUMNS].round(2)
+        payment_method_analysis = payment_method_analysis.sort_values('Fraud_Rate_%', ascending=False)
+
+        print("\nPayment Method Risk Profile:")
+        print(payment_method_analysis.to_string())
+    return {'payment_method_analysis': payment_method_analysis}
+
+
+def _categories(data, deps):
+    with section('[5] PRODUCT CATEGORY FRAUD ANALYSIS', rows=len(data.df)):
+        print("\n[5] PRODUCT CATEGORY FRAUD ANALYSIS")
+        print("-" * 70)
+        category_analysis = cube_report(deps['cube']['cube'], 'category')[SEGMENT_COLUMNS].round(2)
+        category_analysis = category_analysis.rename(columns={'Total_Amount': 'Total_Fraud_Amount'})
+        category_analysis = category_analysis.sort_values('Fraud_Count', ascending=False)
+
+        print("\nCategory Fraud Risk Profile:")
+        print(category_analysis.to_string())
+    return {'category_analysis': category_analysis}
+
+
+def _users(data, deps):
+    with section('[6] USER CONCENTRATION & RISK PROFILING', rows=len(data.df)):
+        print("\n[6] USER CONCENTRATION & RISK PROFILING")
+        print("-" * 70)
+        user_profile = user_profiles(data.df, fraud=data.is_fraud)
+        top_users = top_k(user_profile, 10, by='Frauds')
+
+        users_with_fraud = (user_profile['Frauds'] > 0).sum()
+        print(f"\nTotal Unique Users: {len(user_profile):,}")
+        print(f"Users with Fraud: {users_with_fraud:,}")
+        print(f"\nTop 10 Fraudulent Users (by incident count):")
+        for idx, user in enumerate(top_users.itertuples(), 1):
+            print(f"  {idx}. User {user.Index}: {user.Frauds} frauds (${user.Fraud_Amount:.2f}), "
+                  f"{user.Frauds / user.Transactions * 100:.1f}% fraud rate out of {user.Transactions} transactions")
+
+        print(f"\nFraud Concentration:")
+        top_10_fraud_pct = (top_users['Frauds'].sum() / user_profile['Frauds'].sum() * 100)
+        print(f"  Top 10 users account for {top_10_fraud_pct:.1f}% of all fraud incidents")
+    return {'total_users': len(user_profile), 'users_with_fraud': users_with_fraud, 'top_users': top_users,
+            'top_10_fraud_pct': top_10_fraud_pct}
+
+
+def _temporal(data, deps):
+    with section('[7] TEMPORAL PATTERN ANALYSIS', rows=len(data.df)):
+        print("\n[7] TEMPORAL PATTERN ANALYSIS")
+        print("-" * 70)
+        hourly_fraud = cube_report(deps['cube']['cube'], 'hour')[['Total_Transactions', 'Fraud_Count', 'Fraud_Rate_%']].round(2)
+        print("\nHourly Fraud Pattern (Top 5 High-Risk Hours):")
+        print(hourly_fraud.sort_values('Fraud_Rate_%', ascending=False).head(5).to_string())
+
+        peak_hour = hourly_fraud['Fraud_Count'].idxmax()
+        print(f"\nPeak Fraud Hour: {peak_hour}:00 (UTC) with {hourly_fraud.loc[peak_hour, 'Fraud_Count']:.0f} incidents")
+    return {'hourly_fraud': hourly_fraud, 'peak_hour': peak_hour}
+
+
+def _devices(data, deps):
+    df = data.df
+    with section('[8] DEVICE FINGERPRINTING & RISK ASSESSMENT', rows=len(df)):
+        print("\n[8] DEVICE FINGERPRINTING & RISK ASSESSMENT")
+        print("-" * 70)
+        device_analysis = segment_risk(df, 'device_id', fraud=data.is_fraud, distinct={'user_id': 'Unique_Users'}).round(2)
+        device_analysis = device_analysis.drop(columns='Total_Amount')
+        device_analysis = device_analysis[device_analysis['Fraud_Count'] > 0].sort_values('Fraud_Count', ascending=False)
+
+        print(f"\nTotal Devices: {df['device_id'].nunique():,}")
+        print(f"Devices with Fraud: {len(device_analysis):,}")
+        print("\nTop 10 Suspicious Devices:")
+        print(device_analysis.head(10).to_string())
+
+        from fraud_graph import DeviceGraph
+
+        # Accounts linked through shared devices, directly or transitively
+        device_graph = DeviceGraph.from_frame(df, fraud=data.is_fraud)
+        rings = device_graph.components(min_users=2).round(2)
+        print(f"\nShared-Device Clusters: {device_graph.n_components:,} connected user/device components, "
+              f"{len(rings):,} with 2+ users ({(rings['Frauds'] > 0).sum():,} with fraud)")
+        print(rings.head(5).to_string())
+    return {'device_analysis': device_analysis, 'shared_device_clusters': rings}
+
+
+def _correlations(data, deps):
+    df = data.df
+    with section('[9] STATISTICAL CORRELATION ANALYSIS', rows=len(df)):
+        print("\n[9] STATISTICAL CORRELATION ANALYSIS")
+        print("-" * 70)
+
+        from scipy.stats import pointbiserialr
+
+        # Convert fraud to numeric for correlation
+        fraud_numeric = data.is_fraud.astype(int)
+
+        # Correlation with fraud
+        correlations = {}
+        for col in ['amount', 'device_id', 'time']:
+            corr, p_value = pointbiserialr(fraud_numeric, df[col].astype(float))
+            correlations[col] = {'correlation': corr, 'p_value': p_value}
+
+        print("\nPoint-Biserial Correlations with Fraud:")
+        for col, stats in correlations.items():
+            print(f"  {col}: r={stats['correlation']:.4f}, p-value={stats['p_value']:.6f} {'***' if stats['p_value'] < 0.001 else '**' if stats['p_value'] < 0.01 else '*' if stats['p_value'] < 0.05 else 'ns'}")
+
+        print("\n*** p < 0.001 (highly significant)")
+        print("** p < 0.01 (very significant)")
+        print("* p < 0.05 (significant)")
+        print("ns = not significant")
+    return {'correlations': pd.DataFrame(correlations).T.rename_axis('Feature')}
+
+
+def _significance_tests(data, deps):
+    # Computed ahead of the insights, which cite it; printed as the last section
+    from significance import significance_report, significance_summary
+
+    with section('segment significance tests', rows=len(data.df)):
+        # Every segment's fraud rate against the global rate, BH FDR-corrected as one family
+        report = significance_report(data.df, fraud=data.is_fraud)
+        return {'report': report, 'summary': significance_summary(report)}
+
+
+def _significance(data, deps):
+    from significance import DEFAULT_ALPHA
+
+    report, summary = deps['significance_tests']['report'], deps['significance_tests']['summary']
+    with section('[11] SEGMENT SIGNIFICANCE TESTS', rows=len(report)):
+        print("\n[11] SEGMENT SIGNIFICANCE TESTS")
+        print("-" * 70)
+
+        print(f"\nSegment Fraud Rate vs Global Rate ({len(report):,} segments, exact binomial / chi-square, "
+              f"BH FDR q < {DEFAULT_ALPHA}):")
+        print(summary.to_string())
+        print("\nMost Significant Segments (by adjusted p-value):")
+        print(report.head(10)[['Total_Transactions', 'Fraud_Count', 'Fraud_Rate_%', 'Lift', 'Test',
+                               'P_Value', 'Q_Value']].round(4).to_string())
+    return {'significance_summary': summary, 'segment_significance': report.reset_index()}
+
+
+def _insights(data, deps):
+    imbalance, amounts = deps['class_imbalance'], deps['amounts']
+    payment_method_analysis = deps['payment_methods']['payment_method_analysis']
+    category_analysis = deps['categories']['category_analysis']
+    significant = deps['significance_tests']['summary']
+    with section('[10] SENIOR-LEVEL INSIGHTS & RECOMMENDATIONS', rows=len(data.df)):
+        print("\n[10] SENIOR-LEVEL INSIGHTS & RECOMMENDATIONS")
+        print("-" * 70)
+
+        findings = [
+            f"\n1. CLASS IMBALANCE: {imbalance['fraud_percentages'].get('YES', 0):.2f}% fraud rate indicates severe imbalance",
+            f"   → Recommendation: Use stratified sampling and weighted models",
     
-    f"\n2. FRAUD VALUE PATTERN: Fraudulent transactions average ${fraud_mean:.2f} vs ${legit_mean:.2f} for legitimate",
-    f"   → Insight: {mean_ratio:.2f}x value uplift suggests intentional high-value targeting",
-    f"   → Recommendation: Implement amount-based thresholds and transaction monitoring",
+            f"\n2. FRAUD VALUE PATTERN: Fraudulent transactions average ${amounts['fraud_mean']:.2f} vs ${amounts['legit_mean']:.2f} for legitimate",
+            f"   → Insight: {amounts['mean_ratio']:.2f}x value uplift suggests intentional high-value targeting",
+            f"   → Recommendation: Implement amount-based thresholds and transaction monitoring",
     
-    f"\n3. PAYMENT METHOD RISK: {payment_method_analysis.index[0]} shows {payment_method_analysis['Fraud_Rate_%'].iloc[0]:.2f}% fraud rate",
-    f"   → Recommendation: Enhanced security for high-risk payment methods",
+            f"\n3. PAYMENT METHOD RISK: {payment_method_analysis.index[0]} shows {payment_method_analysis['Fraud_Rate_%'].iloc[0]:.2f}% fraud rate",
+            f"   → Recommendation: Enhanced security for high-risk payment methods",
     
-    f"\n4. USER CONCENTRATION: Top 10 users account for {top_10_fraud_pct:.1f}% of fraud",
-    f"   → Insight: Highly concentrated fraud suggests organized crime or compromised accounts",
-    f"   → Recommendation: Implement user-level risk scoring and account restrictions",
+            f"\n4. USER CONCENTRATION: Top 10 users account for {deps['users']['top_10_fraud_pct']:.1f}% of fraud",
+            f"   → Insight: Highly concentrated fraud suggests organized crime or compromised accounts",
+            f"   → Recommendation: Implement user-level risk scoring and account restrictions",
     
-    f"\n5. TEMPORAL PATTERNS: Peak fraud at {peak_hour}:00 UTC",
-    f"   → Recommendation: Increase monitoring during peak hours",
+            f"\n5. TEMPORAL PATTERNS: Peak fraud at {deps['temporal']['peak_hour']}:00 UTC",
+            f"   → Recommendation: Increase monitoring during peak hours",
     
-    f"\n6. CATEGORY TARGETING: {category_analysis.index[0]} most targeted category",
-    f"   → Recommendation: Category-specific fraud prevention and inventory security",
+            f"\n6. CATEGORY TARGETING: {category_analysis.index[0]} most targeted category",
+            f"   → Recommendation: Category-specific fraud prevention and inventory security",
+    
+            f"\n7. SEGMENT SIGNIFICANCE: {significant['Higher_Risk'].sum():,} of {significant['Segments'].sum():,} segments have a significantly higher fraud rate after FDR correction",
+            f"   → Recommendation: Rank devices and users by adjusted significance, not raw fraud counts",
+        ]
+
+        for finding in findings:
+            print(finding)
+    return {'findings': [finding.strip() for finding in findings]}
+
+
+# (name, function, dependencies, version), in report order
+SECTION_TASKS = [
+    ('cube', _cube, (), 1),
+    ('overview', _overview, (), 1),
+    ('class_imbalance', _class_imbalance, (), 1),
+    ('amounts', _amounts, (), 1),
+    ('payment_methods', _payment_methods, ('cube',), 1),
+    ('categories', _categories, ('cube',), 1),
+    ('users', _users, (), 1),
+    ('temporal', _temporal, ('cube',), 1),
+    ('devices', _devices, (), 1),
+    ('correlations', _correlations, (), 1),
+    ('significance_tests', _significance_tests, (), 1),
+    ('insights', _insights, ('class_imbalance', 'amounts', 'payment_methods', 'categories', 'users', 'temporal',
+                             'significance_tests'), 1),
+    ('significance', _significance, ('significance_tests',), 1),
 ]
-
-for finding in findings:
-    print(finding)
-
-print("\n" + "="*70)
-print("EDA ANALYSIS COMPLETE")
-print("="*70)
-print("\nNext Steps:")
-print("  1. Feed these insights into feature engineering for ML models")
-print("  2. Implement thresholds based on transaction amount and time patterns")
-print("  3. Create user and device risk scoring algorithms")
-print("  4. Develop real-time monitoring dashboard for peak fraud hours")
-print("  5. Consider ensemble methods for imbalanced classification")
-print("\n")
+# Intermediate results that are not part of the report's structured output
+INTERNAL_TASKS = {'cube', 'significance_tests'}
+
+
+def _jsonable(value):
+    if isinstance(value, pd.DataFrame):
+        return value.reset_index().to_dict(orient='records')
+    if isinstance(value, pd.Series):
+        return value.to_dict()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def save_results(results, directory):
+    """Write every section's results as one JSON file plus a Parquet file per table (needs pyarrow)."""
+    os.makedirs(directory, exist_ok=True)
+    sections = {name: result.results for name, result in results.items() if name not in INTERNAL_TASKS}
+    path = os.path.join(directory, 'eda_results.json')
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as fh:
+        json.dump(sections, fh, indent=2, default=_jsonable)
+    os.replace(tmp_path, path)
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return [path]
+    written = [path]
+    for name, values in sections.items():
+        for key, value in values.items():
+            if isinstance(value, pd.DataFrame):
+                table_path = os.path.join(directory, f'{name}.{key}.parquet')
+                # Parquet needs string column labels; the index is kept as a column
+                value.rename(columns=str).to_parquet(table_path)
+                written.append(table_path)
+    return written
+
+
+def run_eda(df, n_jobs=None, cache_dir=DEFAULT_CACHE_DIR, results_dir=None):
+    """Print every EDA section for a frame returned by load(); returns {task: TaskResult}.
+
+    Sections run as a dependency graph on ``n_jobs`` threads and their text
+    and results are cached in ``cache_dir`` (None disables the cache), keyed
+    by the data fingerprint, each section's code (and the helper modules
+    it uses) and its version.
+    """
+    data = SimpleNamespace(df=df, is_fraud=fraud_flags(df['fraud']), is_legit=fraud_flags(~df['fraud']))
+    tasks = [Task(name, func, deps, version) for name, func, deps, version in SECTION_TASKS]
+    if get_tracer().profile:
+        # cProfile and tracemalloc measure the whole process, not one thread
+        n_jobs = 1
+
+    print("\n" + "="*70)
+    print("FRAUD DETECTION EDA - STATISTICAL ANALYSIS")
+    print("="*70)
+
+    with section('fingerprint', rows=len(df)):
+        fingerprint = data_fingerprint(df)
+    cache = ResultCache(cache_dir) if cache_dir else None
+    results = run_tasks(tasks, data, fingerprint, cache=cache, n_jobs=n_jobs,
+                        on_done=lambda name, result: sys.stdout.write(result.text))
+    cached = sum(result.cached for result in results.values())
+    print(f"EDA sections: {len(results) - cached} computed, {cached} cached"
+          + (f" ({cache_dir})" if cache else ""), file=sys.stderr)
+
+    print("\n" + "="*70)
+    print("EDA ANALYSIS COMPLETE")
+    print("="*70)
+    print("\nNext Steps:")
+    print("  1. Feed these insights into feature engineering for ML models")
+    print("  2. Implement thresholds based on transaction amount and time patterns")
+    print("  3. Create user and device risk scoring algorithms")
+    print("  4. Develop real-time monitoring dashboard for peak fraud hours")
+    print("  5. Consider ensemble methods for imbalanced classification")
+    print("\n")
+
+    if results_dir:
+        for path in save_results(results, results_dir):
+            print(f"Results saved as '{path}'", file=sys.stderr)
+    return results
+
+
+def main(argv=None, prog=None):
+    warnings.filterwarnings('ignore')
+    args = build_parser(prog).parse_args(argv)
+    configure('exploratory_analysis', args.trace, args.profile)
+    run_eda(load(args.data), n_jobs=args.jobs, cache_dir=None if args.no_cache else args.cache_dir,
+            results_dir=args.results)
+
+
+if __name__ == '__main__':
+    main()
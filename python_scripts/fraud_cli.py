@@ -0,0 +1,88 @@
+"""
+========================================================================
+FRAUD DETECTION - UNIFIED COMMAND LINE
+========================================================================
+Purpose: One entry point for the pipeline stages
+Commands: clean, eda, train, train-stream, score (each takes that script's own options,
+          e.g. fraud_cli.py score --artifact model.joblib stdin)
+Startup: only the chosen command's module is imported, and the modules
+         defer sklearn / scipy / pandas until a code path needs them
+Benchmark: fraud_cli.py startup - fresh-interpreter startup time per
+           command and the heavy libraries each one loads
+========================================================================
+"""
+
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+COMMANDS = {
+    'clean': ('data_cleaning', "Clean the messy fraud dataset"),
+    'eda': ('exploratory_analysis', "Statistical EDA of the cleaned data"),
+    'train': ('model_baseline', "Train the baseline models and save the scoring artifact"),
+    'train-stream': ('incremental_training', "Out-of-core logistic regression (chunked, warm-startable)"),
+    'score': ('scoring', "Score transactions with a saved artifact (serve, stdin, bench)"),
+}
+HEAVY_MODULES = ['pandas', 'sklearn', 'scipy', 'matplotlib', 'seaborn', 'pyarrow', 'joblib']
+
+
+def run(command, argv=None):
+    """Import the command's module and run its main() with ``argv``."""
+    module = importlib.import_module(COMMANDS[command][0])
+    return module.main(argv, prog=f'{os.path.basename(sys.argv[0])} {command}')
+
+
+def _best_of(cmd, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def startup_times(commands=tuple(COMMANDS), repeats=5):
+    """Rows of (command, best --help wall seconds, heavy modules imported).
+
+    ``--help`` exits right after the parser is built, so the time is the
+    interpreter plus everything the command imports up front.
+    """
+    rows = [('python', _best_of([sys.executable, '-c', 'pass'], repeats), [])]
+    for command in commands:
+        seconds = _best_of([sys.executable, os.path.join(SCRIPTS_DIR, 'fraud_cli.py'), command, '--help'],
+                           repeats)
+        probe = (f"import sys; sys.path.insert(0, {SCRIPTS_DIR!r}); import {COMMANDS[command][0]}; "
+                 f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+        loaded = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                                check=True).stdout.split()
+        rows.append((command, seconds, loaded))
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in COMMANDS:
+        return run(argv[0], argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description="Fraud detection pipeline",
+        epilog="commands:\n" + "\n".join(f"  {name:<13} {help_text}"
+                                          for name, (_, help_text) in COMMANDS.items())
+               + "\n  startup       Benchmark the startup time of every command",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=list(COMMANDS) + ['startup'])
+    parser.add_argument('--repeats', type=int, default=5, help="startup: runs per command (best is kept)")
+    args = parser.parse_args(argv)
+
+    print(f"Startup time, best of {args.repeats} (interpreter + imports + --help):")
+    for command, seconds, loaded in startup_times(repeats=args.repeats):
+        print(f"  {command:<13} {seconds * 1000:>8.0f} ms  {' '.join(loaded) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
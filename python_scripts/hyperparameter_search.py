@@ -0,0 +1,259 @@
+"""
+========================================================================
+FRAUD DETECTION - HYPERPARAMETER SEARCH (SUCCESSIVE HALVING)
+========================================================================
+Purpose: Tune the baseline models without a days-long full grid
+Method: Sample candidates from each model's search space, train them on
+        a small stratified subsample, keep the best 1/eta and grow the
+        subsample eta-fold, until the survivors train on all rows
+Objective: business cost at the cost-optimal threshold (default), F1 or
+           ROC-AUC, always measured on the same held-out validation fold
+Resume: every finished trial is appended to a JSONL log; rerunning with
+        the same log skips trials already done on the same data and seed
+Data: only the training part of model_baseline.py's 80/20 split, so its test
+      metrics stay unbiased with --tuned-params
+Output: best params per model as JSON, for model_baseline.py --tuned-params
+========================================================================
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from sklearn.model_selection import ParameterSampler
+from threadpoolctl import threadpool_limits
+
+from columnar_store import data_fingerprint
+from cross_validation import SharedMatrix, fold_slices, make_model
+from threshold_optimizer import DEFAULT_FN_COST, DEFAULT_FP_COST, optimal_threshold
+from training_orchestrator import evaluate
+
+SEARCH_SPACES = {
+    'Logistic Regression': {
+        'C': [0.001, 0.01, 0.1, 1.0, 10.0],
+    },
+    'Random Forest': {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [8, 15, 25, None],
+        'min_samples_leaf': [1, 5, 20],
+        'max_features': ['sqrt', 0.5],
+    },
+    'Gradient Boosting': {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [3, 5, 7],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'subsample': [0.7, 1.0],
+    },
+    'Hist Gradient Boosting': {
+        'max_iter': [100, 200, 400],
+        'max_depth': [3, 5, 8, None],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'min_samples_leaf': [20, 50, 100],
+        'l2_regularization': [0.0, 1.0],
+    },
+}
+
+# Objective -> (trial record key, True if larger is better)
+OBJECTIVES = {'cost': ('cost', False), 'f1': ('F1-Score', True), 'roc_auc': ('ROC-AUC', True)}
+VALIDATION_FOLD = 0  # of 5 stratified folds, i.e. a 20% validation split
+DEFAULT_LOG = 'search_trials.jsonl'
+
+
+class TrialLog:
+    """Append-only JSONL record of finished trials, keyed by trial_key()."""
+
+    def __init__(self, path):
+        self.path = path
+        self.trials = {}
+        if path and os.path.exists(path):
+            with open(path) as fh:
+                for line in fh:
+                    line = line.strip()
+                    if line:
+                        record = json.loads(line)
+                        self.trials[record['key']] = record
+
+    def get(self, key):
+        return self.trials.get(key)
+
+    def append(self, record):
+        self.trials[record['key']] = record
+        if self.path:
+            with open(self.path, 'a') as fh:
+                fh.write(json.dumps(record, default=str) + '\n')
+                fh.flush()
+
+
+def trial_key(fingerprint, spec, rows, fp_cost, fn_cost, seed):
+    # The seed picks the validation fold and the subsample order, so it is part of the trial
+    payload = json.dumps({'data': fingerprint, 'estimator': spec['estimator'], 'params': spec['params'],
+                          'rows': rows, 'costs': [fp_cost, fn_cost], 'seed': seed},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def run_trial(spec, directory, feature_names, rows, fp_cost, fn_cost):
+    """Fit ``spec`` on the first ``rows`` training rows and score the validation fold."""
+    X = np.load(os.path.join(directory, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(directory, 'y.npy'), mmap_mode='r')
+    order = np.load(os.path.join(directory, 'order.npy'), mmap_mode='r')
+    train = np.sort(order[:rows])
+    _, valid = fold_slices(np.load(os.path.join(directory, 'bounds.npy')), VALIDATION_FOLD)
+
+    with threadpool_limits(limits=1):
+        start = time.perf_counter()
+        model = make_model(spec, feature_names)
+        model.fit(X[train], y[train])
+        fit_seconds = time.perf_counter() - start
+        y_proba = model.predict_proba(X[valid])[:, 1]
+        y_pred = model.predict(X[valid])
+
+    best = optimal_threshold(y[valid], y_proba, fp_cost, fn_cost)
+    return {'cost': float(best['cost']), 'threshold': float(best['threshold']),
+            'fit_seconds': round(fit_seconds, 3), **evaluate(y[valid], y_pred, y_proba)}
+
+
+def stratified_order(y, train_rows, seed):
+    """Training rows ordered so that every prefix keeps the class ratio.
+
+    Within each class the rows are shuffled; a row's position is its rank in
+    its class divided by the class size, so prefixes interleave the classes.
+    """
+    rng = np.random.default_rng(seed)
+    labels = np.asarray(y)[train_rows]
+    key = np.empty(len(train_rows))
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        key[members[rng.permutation(len(members))]] = (np.arange(len(members)) + 0.5) / len(members)
+    return train_rows[np.argsort(key, kind='stable')]
+
+
+def rung_sizes(n_candidates, n_rows, eta, min_rows):
+    """Subsample size per rung; the last rung uses every training row."""
+    n_rungs = max(1, int(math.floor(math.log(n_candidates, eta) + 1e-9)) + 1)
+    return [max(min(min_rows, n_rows), n_rows // eta ** (n_rungs - 1 - i)) for i in range(n_rungs)]
+
+
+def successive_halving(base_spec, n_candidates, shared, fingerprint, pool, log, objective='cost',
+                       eta=3, min_rows=2000, fp_cost=DEFAULT_FP_COST, fn_cost=DEFAULT_FN_COST,
+                       seed=42, verbose=True):
+    """Search one model's space; returns the final rung's trials, best first."""
+    metric, maximize = OBJECTIVES[objective]
+    space = SEARCH_SPACES[base_spec['name']]
+    candidates = list(ParameterSampler(space, n_iter=min(n_candidates, _space_size(space)),
+                                       random_state=seed))
+    n_rows = len(np.load(shared.path('order'), mmap_mode='r'))
+    survivors = candidates
+    for rung, rows in enumerate(rung_sizes(len(candidates), n_rows, eta, min_rows)):
+        keys = []
+        futures = {}
+        for params in survivors:
+            spec = {**base_spec, 'params': {**base_spec['params'], **params}}
+            keys.append(trial_key(fingerprint, spec, rows, fp_cost, fn_cost, seed))
+            if log.get(keys[-1]) is None:
+                futures[pool.submit(run_trial, spec, shared.directory, shared.feature_names,
+                                    rows, fp_cost, fn_cost)] = (keys[-1], params)
+        for future in as_completed(futures):
+            key, params = futures[future]
+            log.append({'key': key, 'model': base_spec['name'], 'params': params, 'rung': rung,
+                        'rows': rows, **future.result()})
+
+        # Stable sort over the candidate order, so ties break the same way on every run
+        trials = sorted((log.get(key) for key in keys), key=lambda trial: trial[metric], reverse=maximize)
+        if verbose:
+            resumed = len(survivors) - len(futures)
+            print(f"  rung {rung}: {len(survivors):>3} candidate(s) on {rows:>9,} rows"
+                  f"  best {metric} {trials[0][metric]:.4f}"
+                  + (f"  ({resumed} resumed from log)" if resumed else ""))
+        survivors = [trial['params'] for trial in trials[:max(1, len(trials) // eta)]]
+    return trials
+
+
+def _space_size(space):
+    return math.prod(len(values) for values in space.values())
+
+
+def search(specs, X, y, n_candidates=27, objective='cost', eta=3, min_rows=2000,
+           fp_cost=DEFAULT_FP_COST, fn_cost=DEFAULT_FN_COST, n_jobs=None, log_path=DEFAULT_LOG,
+           seed=42, verbose=True):
+    """Successive halving for every spec with a search space; returns {name: final trials}."""
+    log = TrialLog(log_path)
+    fingerprint = data_fingerprint(X, y)
+    results = {}
+    with SharedMatrix(X, y, seed=seed) as shared:
+        folds = np.load(shared.path('fold'))
+        # Row positions are in the shared layout (grouped by fold), so use its labels
+        labels = np.load(shared.path('y'), mmap_mode='r')[:len(folds)]
+        shared.save('order', stratified_order(labels, np.flatnonzero(folds != VALIDATION_FOLD), seed))
+        with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count() or 1) as pool:
+            for spec in specs:
+                if spec['name'] not in SEARCH_SPACES:
+                    continue
+                if verbose:
+                    print(f"\n{spec['name']}:")
+                results[spec['name']] = successive_halving(
+                    spec, n_candidates, shared, fingerprint, pool, log, objective, eta, min_rows,
+                    fp_cost, fn_cost, seed, verbose)
+    return results
+
+
+if __name__ == '__main__':
+    from sklearn.model_selection import train_test_split
+
+    from columnar_store import load_cleaned
+    from model_baseline import baseline_specs
+    from scoring import model_frame
+    from velocity_features import velocity_features
+
+    parser = argparse.ArgumentParser(description="Successive-halving search for the baseline models")
+    parser.add_argument('--data', default='cleaned_fraud_data.csv')
+    parser.add_argument('--models', nargs='+', default=None, help="Default: every baseline model")
+    parser.add_argument('--gb-engine', choices=['exact', 'hist', 'both'], default='exact')
+    parser.add_argument('--objective', choices=list(OBJECTIVES), default='cost')
+    parser.add_argument('--candidates', type=int, default=27, help="Candidates sampled per model")
+    parser.add_argument('--eta', type=int, default=3, help="Keep 1/eta per rung, grow rows eta-fold")
+    parser.add_argument('--min-rows', type=int, default=2000, help="Minimum training rows in the first rung")
+    parser.add_argument('--fp-cost', type=float, default=DEFAULT_FP_COST)
+    parser.add_argument('--fn-cost', type=float, default=DEFAULT_FN_COST)
+    parser.add_argument('--velocity', action='store_true')
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--log', default=DEFAULT_LOG, help="Trial log (JSONL); reruns resume from it")
+    parser.add_argument('--output', default='best_params.json')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    df = load_cleaned(args.data, columns=['user_id', 'amount', 'payment_method', 'category',
+                                          'device_id', 'time', 'fraud'])
+    df_model, _, _ = model_frame(df)
+    if args.velocity:
+        df_model = df_model.join(velocity_features(df))
+    X = df_model.drop('fraud', axis=1)
+    y = df_model['fraud']
+    # Same split as model_baseline.py: its test rows must never be seen by the search
+    X, _, y, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    specs = [spec for spec in baseline_specs(args.gb_engine)
+             if args.models is None or spec['name'] in args.models]
+    metric, _ = OBJECTIVES[args.objective]
+    print(f"Searching {len(specs)} model(s) on {len(X):,} training rows "
+          f"(model_baseline.py test split held out), objective: {metric}")
+    start = time.perf_counter()
+    results = search(specs, X, y, args.candidates, args.objective, args.eta, args.min_rows,
+                     args.fp_cost, args.fn_cost, args.jobs, args.log, args.seed)
+
+    print("\nBest candidates:")
+    best_params = {}
+    for name, trials in results.items():
+        best = trials[0]
+        best_params[name] = best['params']
+        print(f"  {name}: {metric}={best[metric]:.4f} (cost ${best['cost']:,.0f}, "
+              f"F1 {best['F1-Score']:.4f}, ROC-AUC {best['ROC-AUC']:.4f}) {best['params']}")
+    with open(args.output, 'w') as fh:
+        json.dump(best_params, fh, indent=2)
+    print(f"\nBest params saved as '{args.output}' in {time.perf_counter() - start:.1f}s "
+          f"(use: model_baseline.py --tuned-params {args.output})")
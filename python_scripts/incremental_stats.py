@@ -0,0 +1,362 @@
+"""
+========================================================================
+FRAUD DETECTION - INCREMENTAL EDA STATISTICS
+========================================================================
+Purpose: Keep the EDA statistics up to date batch by batch
+Method: Mergeable state - Chan moments for mean/std, KLL sketches for
+        quartiles, the rollup cube and entity counters for segment
+        tables, co-moments for the point-biserial correlations
+Storage: eda_state.json for the fixed-size summaries; the cube cells and
+         entity counters are upserted into eda_state.sqlite beside it, so
+         a batch costs O(batch) however many days, users and devices
+         have been seen
+Usage: python incremental_stats.py update --data new_batch.csv
+       python incremental_stats.py report
+========================================================================
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from rollup_cube import build_cube, create_cube_table, cube_report, merge_cubes, read_cube, upsert_cube
+from segment_risk import SEGMENT_COLUMNS, fraud_flags
+from streaming_cleaner import KLLSketch, RunningMoments
+
+DEFAULT_STATE_PATH = 'eda_state.json'
+CORRELATION_COLUMNS = ['amount', 'device_id', 'time']
+ENTITY_KEYS = ['user_id', 'device_id']
+ENTITY_COUNTERS = ['txn_count', 'fraud_count', 'amount_sum', 'amount_count']
+CLASS_LABELS = {False: 'NO', True: 'YES'}
+
+
+class RunningCorrelation:
+    """Pearson correlation from mergeable co-moments (equals point-biserial for a 0/1 y)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    def update(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        both = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[both], y[both]
+        if len(x) == 0:
+            return
+        batch = RunningCorrelation()
+        batch.n = len(x)
+        batch.mean_x, batch.mean_y = x.mean(), y.mean()
+        dx, dy = x - batch.mean_x, y - batch.mean_y
+        batch.m2_x, batch.m2_y, batch.c_xy = (dx * dx).sum(), (dy * dy).sum(), (dx * dy).sum()
+        self.merge(batch)
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        total = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.n * other.n / total
+        self.m2_x += other.m2_x + dx * dx * weight
+        self.m2_y += other.m2_y + dy * dy * weight
+        self.c_xy += other.c_xy + dx * dy * weight
+        self.mean_x += dx * other.n / total
+        self.mean_y += dy * other.n / total
+        self.n = total
+
+    def result(self):
+        """``(r, p_value)`` as scipy.stats.pointbiserialr would report them."""
+        if self.n < 3 or self.m2_x == 0 or self.m2_y == 0:
+            return np.nan, np.nan
+        r = self.c_xy / np.sqrt(self.m2_x * self.m2_y)
+        r = float(np.clip(r, -1.0, 1.0))
+        if abs(r) == 1.0:
+            return r, 0.0
+        t = r * np.sqrt((self.n - 2) / (1 - r * r))
+        return r, float(2 * stats.t.sf(abs(t), self.n - 2))
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, state):
+        correlation = cls()
+        vars(correlation).update(state)
+        return correlation
+
+
+def entity_counters(df, key, is_fraud):
+    """Mergeable per-entity counters (transactions, frauds, amount sum/count)."""
+    amounts = df['amount'].to_numpy(dtype=np.float64, na_value=np.nan)
+    counters = pd.DataFrame({
+        key: df[key].astype('Int64').array,
+        'txn_count': 1,
+        'fraud_count': is_fraud.astype(np.int64),
+        'amount_sum': np.nan_to_num(amounts),
+        'amount_count': (~np.isnan(amounts)).astype(np.int64),
+    })
+    return counters.groupby(key).sum()
+
+
+def add_counters(mine, other):
+    """Sum two entity counter tables (entities missing from one count as zero)."""
+    if mine is None or other is None:
+        return other if mine is None else mine
+    return mine.add(other, fill_value=0).astype(mine.dtypes.to_dict())
+
+
+def add_cubes(mine, other):
+    if mine is None or other is None:
+        return other if mine is None else mine
+    return merge_cubes([mine, other])
+
+
+def store_path(state_path):
+    return f'{os.path.splitext(state_path)[0]}.sqlite'
+
+
+class StateStore:
+    """The growing part of the state in a SQLite file: cube cells, entity counters, batch count.
+
+    Saving a batch upserts its cube cells and entities (adding to the stored
+    values in place), so nothing already stored is read or rewritten. The
+    cube table is the one rollup_cube.py reads, so the cube queries also
+    run against this file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with sqlite3.connect(path) as conn:
+            create_cube_table(conn)
+            for key in ENTITY_KEYS:
+                conn.execute(f'CREATE TABLE IF NOT EXISTS entity_{key} ({key} INTEGER PRIMARY KEY, '
+                             'txn_count INTEGER NOT NULL, fraud_count INTEGER NOT NULL, '
+                             'amount_sum REAL NOT NULL, amount_count INTEGER NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS entity_batches (batches INTEGER NOT NULL)')
+
+    def batches(self):
+        with sqlite3.connect(self.path) as conn:
+            row = conn.execute('SELECT batches FROM entity_batches').fetchone()
+        return 0 if row is None else row[0]
+
+    def add(self, cube, entities, batches):
+        """Upsert a cube and {key: counters} and record the new batch total, in one transaction."""
+        updates = ', '.join(f'{column} = {column} + excluded.{column}' for column in ENTITY_COUNTERS)
+        with sqlite3.connect(self.path) as conn:
+            if cube is not None:
+                upsert_cube(conn, cube)
+            for key, counters in entities.items():
+                if counters is None:
+                    continue
+                rows = zip(counters.index.to_numpy(dtype=np.int64).tolist(),
+                           *(counters[column].tolist() for column in ENTITY_COUNTERS))
+                conn.executemany(f'INSERT INTO entity_{key} VALUES (?, ?, ?, ?, ?) '
+                                 f'ON CONFLICT({key}) DO UPDATE SET {updates}', rows)
+            conn.execute('DELETE FROM entity_batches')
+            conn.execute('INSERT INTO entity_batches VALUES (?)', (batches,))
+
+    def counters(self, key):
+        with sqlite3.connect(self.path) as conn:
+            counters = pd.read_sql_query(f'SELECT * FROM entity_{key} ORDER BY {key}', conn)
+        return counters.astype({key: 'Int64'}).set_index(key)
+
+    def cube(self):
+        return read_cube(self.path)
+
+
+class EDAState:
+    """Everything the EDA report needs, as a mergeable summary of all batches seen.
+
+    ``cube`` and ``entities`` hold what is not yet in ``store`` (the batches
+    folded in since the state was loaded); full_cube() and
+    entity_counters() give the totals.
+    """
+
+    def __init__(self):
+        self.batches = 0
+        self.store = None
+        self.stored_batches = 0
+        self.cube = None
+        self.amount_moments = {label: RunningMoments() for label in CLASS_LABELS.values()}
+        self.amount_sketches = {label: KLLSketch() for label in CLASS_LABELS.values()}
+        self.entities = {key: None for key in ENTITY_KEYS}
+        self.correlations = {column: RunningCorrelation() for column in CORRELATION_COLUMNS}
+
+    @classmethod
+    def from_batch(cls, df):
+        """State of a single batch of cleaned rows (typed or YES/NO labels)."""
+        state = cls()
+        state.batches = 1
+        is_fraud = fraud_flags(df['fraud'])
+        has_label = df['fraud'].notna().to_numpy()
+        amounts = df['amount'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        state.cube = build_cube(df)
+        for flag, label in CLASS_LABELS.items():
+            in_class = has_label & (is_fraud == flag)
+            state.amount_moments[label].update(amounts[in_class])
+            state.amount_sketches[label].update(amounts[in_class])
+        for key in ENTITY_KEYS:
+            state.entities[key] = entity_counters(df, key, is_fraud)
+        labels = np.where(has_label, is_fraud, np.nan)
+        for column in CORRELATION_COLUMNS:
+            state.correlations[column].update(
+                df[column].to_numpy(dtype=np.float64, na_value=np.nan), labels)
+        return state
+
+    def update(self, df):
+        """Fold a new batch into the state; costs O(batch), not O(history)."""
+        self.merge(EDAState.from_batch(df))
+
+    def merge(self, other):
+        self.batches += other.batches
+        self.cube = add_cubes(self.cube, other.full_cube())
+        for label in CLASS_LABELS.values():
+            self.amount_moments[label].merge(other.amount_moments[label])
+            self.amount_sketches[label].merge(other.amount_sketches[label])
+        for key in ENTITY_KEYS:
+            self.entities[key] = add_counters(self.entities[key], other.entity_counters(key))
+        for column in CORRELATION_COLUMNS:
+            self.correlations[column].merge(other.correlations[column])
+
+    def full_cube(self):
+        """The cube over every batch (stored and not yet saved)."""
+        if self.store is None:
+            return self.cube
+        return add_cubes(self.store.cube(), self.cube)
+
+    def entity_counters(self, key):
+        """Per-entity counters over every batch (stored and not yet saved)."""
+        if self.store is None:
+            return self.entities[key]
+        return add_counters(self.store.counters(key), self.entities[key])
+
+    def save(self, path):
+        """Upsert the new cube cells and entity counters into the store beside ``path``, then write the JSON."""
+        store = StateStore(store_path(path))
+        if store.batches() != self.stored_batches:
+            raise ValueError(f"'{store.path}' holds {store.batches()} batches but this state expects "
+                             f"{self.stored_batches}; it belongs to another state file")
+        store.add(self.cube, self.entities, self.batches)
+        self.store, self.stored_batches = store, self.batches
+        self.cube = None
+        self.entities = {key: None for key in ENTITY_KEYS}
+
+        state = {
+            'batches': self.batches,
+            'amount_moments': {k: v.to_dict() for k, v in self.amount_moments.items()},
+            'amount_sketches': {k: v.to_dict() for k, v in self.amount_sketches.items()},
+            'correlations': {k: v.to_dict() for k, v in self.correlations.items()},
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as fh:
+            json.dump(state, fh)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            saved = json.load(fh)
+        state = cls()
+        state.batches = saved['batches']
+        state.amount_moments = {k: RunningMoments.from_dict(v) for k, v in saved['amount_moments'].items()}
+        state.amount_sketches = {k: KLLSketch.from_dict(v) for k, v in saved['amount_sketches'].items()}
+        state.correlations = {k: RunningCorrelation.from_dict(v) for k, v in saved['correlations'].items()}
+
+        state.store = StateStore(store_path(path))
+        if 'entities' in saved:
+            # Older state files kept the cube and counters in the JSON; they move to the store on the next save
+            if saved['cube'] is not None:
+                state.cube = pd.DataFrame(saved['cube']).astype({
+                    'day': 'Int32', 'hour': 'Int8', 'payment_method': 'category', 'category': 'category',
+                    'fraud': 'boolean'})
+            state.entities = {k: None if v is None else pd.DataFrame(v).astype({k: 'Int64'}).set_index(k)
+                              for k, v in saved['entities'].items()}
+        else:
+            state.stored_batches = saved['batches']
+        if state.store.batches() != state.stored_batches:
+            raise ValueError(f"'{state.store.path}' holds {state.store.batches()} batches but '{path}' "
+                             f"expects {state.stored_batches}; the two were not saved together")
+        return state
+
+    def report(self):
+        """Print the incremental counterparts of EDA sections 2-9."""
+        cube = self.full_cube()
+        class_counts = cube_report(cube, 'fraud')['Total_Transactions']
+        labelled = class_counts.sum()
+
+        print("\n[2] CLASS IMBALANCE & FRAUD RATE ANALYSIS")
+        print("-" * 70)
+        for flag, label in CLASS_LABELS.items():
+            count = int(class_counts.get(flag, 0))
+            print(f"  {label}: {count:,} transactions ({count / labelled * 100:.2f}%)")
+
+        print("\n[3] TRANSACTION AMOUNT STATISTICAL ANALYSIS")
+        print("-" * 70)
+        for label, title in [('NO', 'Legitimate'), ('YES', 'Fraudulent')]:
+            moments, sketch = self.amount_moments[label], self.amount_sketches[label]
+            q1, median, q3 = (sketch.quantile(q) for q in (0.25, 0.5, 0.75))
+            print(f"\n{label} ({title}):")
+            print(f"  Count: {moments.count:,}")
+            print(f"  Mean: ${moments.mean:.2f}")
+            print(f"  Median: ${median:.2f} (sketch)")
+            print(f"  Std Dev: ${moments.std:.2f}")
+            print(f"  Min: ${moments.min:.2f}")
+            print(f"  Max: ${moments.max:.2f}")
+            print(f"  Q1: ${q1:.2f} (sketch)")
+            print(f"  Q3: ${q3:.2f} (sketch)")
+            print(f"  IQR: ${q3 - q1:.2f}")
+
+        for number, key, title in [(4, 'payment_method', 'PAYMENT METHOD RISK ANALYSIS'),
+                                   (5, 'category', 'PRODUCT CATEGORY FRAUD ANALYSIS'),
+                                   (7, 'hour', 'TEMPORAL PATTERN ANALYSIS')]:
+            print(f"\n[{number}] {title}")
+            print("-" * 70)
+            table = cube_report(cube, key)[SEGMENT_COLUMNS].round(2)
+            print(table.sort_values('Fraud_Rate_%', ascending=False).to_string())
+
+        for number, key, title in [(6, 'user_id', 'USER CONCENTRATION'), (8, 'device_id', 'DEVICE RISK')]:
+            counters = self.entity_counters(key)
+            print(f"\n[{number}] {title} (Top 10 by fraud count)")
+            print("-" * 70)
+            print(f"Unique: {len(counters):,}, with fraud: {(counters['fraud_count'] > 0).sum():,}")
+            print(counters.nlargest(10, 'fraud_count').round(2).to_string())
+
+        print("\n[9] STATISTICAL CORRELATION ANALYSIS")
+        print("-" * 70)
+        for column, correlation in self.correlations.items():
+            r, p_value = correlation.result()
+            print(f"  {column}: r={r:.4f}, p-value={p_value:.6f}")
+
+
+if __name__ == '__main__':
+    from columnar_store import load_cleaned
+
+    parser = argparse.ArgumentParser(description="Incrementally maintained EDA statistics")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    update = subparsers.add_parser('update', help="Fold a batch of cleaned transactions into the state")
+    update.add_argument('--data', required=True, help="Cleaned CSV file or Parquet dataset for the new batch")
+    update.add_argument('--state', default=DEFAULT_STATE_PATH)
+    report = subparsers.add_parser('report', help="Print the EDA statistics from the saved state")
+    report.add_argument('--state', default=DEFAULT_STATE_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'update':
+        state = EDAState.load(args.state) if os.path.exists(args.state) else EDAState()
+        batch = load_cleaned(args.data, columns=['user_id', 'amount', 'payment_method', 'category',
+                                                 'device_id', 'time', 'fraud'])
+        state.update(batch)
+        state.save(args.state)
+        print(f"Folded {len(batch):,} rows into '{args.state}' ({state.batches} batches)")
+    else:
+        EDAState.load(args.state).report()
@@ -0,0 +1,292 @@
+"""
+========================================================================
+FRAUD DETECTION - OUT-OF-CORE LOGISTIC REGRESSION
+========================================================================
+Purpose: Train the logistic-regression baseline on data that does not
+         fit in memory, and keep it current day by day
+Method: The cleaned data is streamed in chunks; StandardScaler.partial_fit
+        on one pass, then SGD (log loss, balanced class weights) over a
+        few passes, shuffling within each chunk
+Holdout: Rows are assigned to the holdout by a hash of their content, so
+         the split is the same for every chunk size, file and day
+Warm start: --warm-start continues yesterday's model on today's data
+            only (vocabulary and scaler stay fixed)
+Memory: One chunk plus fixed-size score histograms for the holdout AUC
+Output: Incremental model (joblib) and optionally a scoring artifact
+========================================================================
+"""
+
+import argparse
+import math
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from columnar_store import iter_cleaned
+from instrumentation import add_instrumentation_args, configure, section
+from scoring import CATEGORICAL_COLUMNS, FEATURE_COLUMNS, RAW_COLUMNS, ScoringArtifact, add_features
+from streaming_cleaner import DEFAULT_CHUNKSIZE
+
+DEFAULT_MODEL = 'incremental_model.joblib'
+HOLDOUT_PERCENT = 20
+AUC_BINS = 10_000
+DEFAULT_EPOCHS = 5
+DEFAULT_ALPHA = 1e-4
+
+
+def holdout_mask(chunk, percent=HOLDOUT_PERCENT):
+    """True for rows in the holdout; decided by a hash of the raw row values."""
+    hashes = pd.util.hash_pandas_object(chunk[RAW_COLUMNS], index=False).to_numpy()
+    return hashes % 100 < percent
+
+
+def usable_rows(chunk):
+    """Rows model_frame() keeps: labelled, complete, non-negative amount."""
+    return ~(chunk.isna().any(axis=1) | (chunk['amount'] < 0).fillna(False)).to_numpy()
+
+
+def scan_vocabulary(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Sorted labels of every categorical column (the LabelEncoder classes), in one column-only pass."""
+    labels = {column: set() for column in CATEGORICAL_COLUMNS}
+    for chunk in iter_cleaned(path, columns=CATEGORICAL_COLUMNS, chunksize=chunksize):
+        for column in CATEGORICAL_COLUMNS:
+            labels[column].update(chunk[column].dropna().astype(str).unique())
+    return {column: sorted(values) for column, values in labels.items()}
+
+
+class StreamingAUC:
+    """ROC-AUC and confusion counts from fixed-size per-class score histograms.
+
+    Scores sharing a bin count as ties (half credit), so with AUC_BINS bins
+    the result is within about 1/AUC_BINS of the exact AUC.
+    """
+
+    def __init__(self, bins=AUC_BINS, threshold=0.5):
+        self.bins = bins
+        self.threshold = threshold
+        self.positive = np.zeros(bins, dtype=np.int64)
+        self.negative = np.zeros(bins, dtype=np.int64)
+        self.confusion = np.zeros((2, 2), dtype=np.int64)  # [actual, predicted]
+        self.log_loss_sum = 0.0
+
+    def update(self, y, proba):
+        y = np.asarray(y, dtype=bool)
+        index = np.minimum((proba * self.bins).astype(np.int64), self.bins - 1)
+        self.positive += np.bincount(index[y], minlength=self.bins)
+        self.negative += np.bincount(index[~y], minlength=self.bins)
+        predicted = proba >= self.threshold
+        self.confusion += np.bincount(y * 2 + predicted, minlength=4).reshape(2, 2)
+        clipped = np.clip(proba, 1e-15, 1 - 1e-15)
+        self.log_loss_sum -= float(np.sum(np.where(y, np.log(clipped), np.log1p(-clipped))))
+
+    @property
+    def rows(self):
+        return int(self.confusion.sum())
+
+    def auc(self):
+        n_pos, n_neg = self.positive.sum(), self.negative.sum()
+        if n_pos == 0 or n_neg == 0:
+            return math.nan
+        negatives_below = np.cumsum(self.negative) - self.negative
+        wins = np.sum(self.positive * (negatives_below + 0.5 * self.negative))
+        return float(wins / (n_pos * n_neg))
+
+    def metrics(self):
+        (tn, fp), (fn, tp) = self.confusion
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        return {'Rows': self.rows, 'ROC-AUC': self.auc(),
+                'Log-Loss': self.log_loss_sum / max(self.rows, 1),
+                'Precision': precision, 'Recall': recall,
+                'F1-Score': 2 * precision * recall / (precision + recall) if precision + recall else 0.0}
+
+
+class IncrementalModel:
+    """Fixed vocabulary + incrementally fitted StandardScaler + SGD logistic regression.
+
+    Features are encoded exactly like model_frame() (categoricals by their
+    position in the sorted vocabulary, unseen labels as -1), so the fitted
+    model can be bundled into a ScoringArtifact.
+    """
+
+    def __init__(self, vocabulary, alpha=DEFAULT_ALPHA, seed=42):
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.preprocessing import StandardScaler
+
+        self.vocabulary = vocabulary
+        self.scaler = StandardScaler()
+        self.model = SGDClassifier(loss='log_loss', alpha=alpha, random_state=seed)
+        self.class_counts = np.zeros(2, dtype=np.int64)
+        self.rows_trained = 0
+        self.seed = seed
+
+    def encode(self, chunk):
+        """``(X, y)`` for the usable rows of a typed chunk (model_frame's exclusions).
+
+        X is a frame, so the scaler records the feature names the scoring
+        artifact's batch path passes in.
+        """
+        frame = chunk[usable_rows(chunk)].copy()
+        for column in CATEGORICAL_COLUMNS:
+            frame[column] = pd.Index(self.vocabulary[column]).get_indexer(frame[column].astype(str))
+        X = add_features(frame)[FEATURE_COLUMNS].astype(np.float64)
+        return X, frame['fraud'].to_numpy(dtype=np.int64)
+
+    def fit_scaler(self, X, y):
+        self.scaler.partial_fit(X)
+        self.class_counts += np.bincount(y, minlength=2)
+
+    def _class_weight(self):
+        """'balanced' weights from every label counted so far."""
+        total = self.class_counts.sum()
+        return {label: total / (2 * count) if count else 1.0 for label, count in enumerate(self.class_counts)}
+
+    def partial_fit(self, X, y, rng):
+        order = rng.permutation(len(y))
+        self.model.class_weight = self._class_weight()
+        self.model.partial_fit(self.scaler.transform(X.iloc[order]), y[order], classes=np.array([0, 1]))
+        self.rows_trained += len(y)
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(self.scaler.transform(X))[:, 1]
+
+    def to_artifact(self, threshold=0.5):
+        from sklearn.preprocessing import LabelEncoder
+
+        encoders = {}
+        for column, labels in self.vocabulary.items():
+            encoders[column] = LabelEncoder()
+            encoders[column].classes_ = np.asarray(labels, dtype=object)
+        return ScoringArtifact(self.model, encoders, scaler=self.scaler,
+                               model_name='SGD Logistic Regression', threshold=threshold)
+
+    def save(self, path=DEFAULT_MODEL):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path=DEFAULT_MODEL):
+        return joblib.load(path)
+
+
+def train_stream(path, chunksize=DEFAULT_CHUNKSIZE, epochs=DEFAULT_EPOCHS, warm_start=None,
+                 holdout_percent=HOLDOUT_PERCENT, alpha=DEFAULT_ALPHA, seed=42, verbose=True):
+    """Fit (or continue) an IncrementalModel over ``path`` and score its holdout stream.
+
+    A fresh model takes a vocabulary pass and a scaler pass first; a warm
+    start keeps both and only adds the new data's labels to the class counts.
+    Returns the model and the holdout StreamingAUC.
+    """
+    def encoded():
+        for chunk in iter_cleaned(path, columns=RAW_COLUMNS + ['fraud'], chunksize=chunksize):
+            X, y = model.encode(chunk)
+            yield X, y, holdout_mask(chunk, holdout_percent)[usable_rows(chunk)]
+
+    if warm_start is None:
+        with section('vocabulary pass'):
+            vocabulary = scan_vocabulary(path, chunksize)
+        model = IncrementalModel(vocabulary, alpha, seed)
+        with section('scaler pass') as record:
+            for X, y, holdout in encoded():
+                model.fit_scaler(X[~holdout], y[~holdout])
+            record['rows'] = int(model.class_counts.sum())
+        if verbose:
+            print(f"Vocabulary: {vocabulary}")
+            print(f"Training rows: {model.class_counts.sum():,} (fraud: {model.class_counts[1]:,})")
+    else:
+        model = warm_start
+        with section('label counts'):
+            for X, y, holdout in encoded():
+                model.class_counts += np.bincount(y[~holdout], minlength=2)
+
+    rng = np.random.default_rng(seed + model.rows_trained)
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        with section(f'epoch {epoch + 1}') as record:
+            rows = 0
+            for X, y, holdout in encoded():
+                if (~holdout).any():
+                    model.partial_fit(X[~holdout], y[~holdout], rng)
+                    rows += int((~holdout).sum())
+            record['rows'] = rows
+        if verbose:
+            print(f"  epoch {epoch + 1}/{epochs}: {rows:,} rows in {time.perf_counter() - start:.2f}s")
+
+    evaluation = StreamingAUC()
+    with section('holdout evaluation') as record:
+        for X, y, holdout in encoded():
+            if holdout.any():
+                evaluation.update(y[holdout], model.predict_proba(X[holdout]))
+        record['rows'] = evaluation.rows
+    return model, evaluation
+
+
+def compare_in_memory(path, model, holdout_percent=HOLDOUT_PERCENT):
+    """Exact holdout ROC-AUC of the in-memory baseline LR vs the incremental model.
+
+    Loads the whole dataset, so it is meant for validation on data that fits.
+    """
+    from sklearn.metrics import roc_auc_score
+
+    from columnar_store import load_cleaned
+    from cross_validation import make_model
+    from model_baseline import baseline_specs
+
+    df = load_cleaned(path, columns=RAW_COLUMNS + ['fraud'])
+    X, y = model.encode(df)
+    holdout = holdout_mask(df, holdout_percent)[usable_rows(df)]
+
+    spec = next(spec for spec in baseline_specs() if spec['name'] == 'Logistic Regression')
+    baseline = make_model(spec, FEATURE_COLUMNS).fit(X[~holdout], y[~holdout])
+    return {'in_memory_auc': roc_auc_score(y[holdout], baseline.predict_proba(X[holdout])[:, 1]),
+            'incremental_auc': roc_auc_score(y[holdout], model.predict_proba(X[holdout]))}
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Out-of-core logistic regression")
+    parser.add_argument('--data', default='cleaned_fraud_data.csv',
+                        help="Cleaned CSV file or day-partitioned Parquet dataset")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--epochs', type=int, default=DEFAULT_EPOCHS, help="SGD passes over the data")
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help="L2 regularization strength")
+    parser.add_argument('--holdout', type=int, default=HOLDOUT_PERCENT, help="Holdout percentage")
+    parser.add_argument('--warm-start', default=None, help="Continue this saved model on --data only")
+    parser.add_argument('--output', default=DEFAULT_MODEL, help="Where to save the incremental model")
+    parser.add_argument('--artifact', default=None, help="Also save a scoring artifact (scoring.py)")
+    parser.add_argument('--compare', action='store_true',
+                        help="Report the ROC-AUC gap against the in-memory baseline LR (loads all data)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = add_instrumentation_args(parser).parse_args(argv)
+    configure('incremental_training', args.trace, args.profile)
+
+    print("\n" + "="*70)
+    print("FRAUD DETECTION - OUT-OF-CORE LOGISTIC REGRESSION")
+    print("="*70)
+    warm_start = IncrementalModel.load(args.warm_start) if args.warm_start else None
+    if warm_start is not None:
+        print(f"Warm start from '{args.warm_start}' ({warm_start.rows_trained:,} SGD row updates so far)")
+    model, evaluation = train_stream(args.data, args.chunksize, args.epochs, warm_start, args.holdout,
+                                     args.alpha, args.seed)
+
+    print(f"\nHoldout stream ({args.holdout}% of rows):")
+    for name, value in evaluation.metrics().items():
+        print(f"  {name}: {value:,}" if name == 'Rows' else f"  {name}: {value:.4f}")
+
+    model.save(args.output)
+    print(f"\nIncremental model saved as '{args.output}'")
+    if args.artifact:
+        model.to_artifact().save(args.artifact)
+        print(f"Scoring artifact saved as '{args.artifact}'")
+
+    if args.compare:
+        with section('in-memory comparison'):
+            comparison = compare_in_memory(args.data, model, args.holdout)
+        gap = comparison['incremental_auc'] - comparison['in_memory_auc']
+        print(f"\nROC-AUC on the holdout: in-memory LR {comparison['in_memory_auc']:.4f}, "
+              f"incremental SGD {comparison['incremental_auc']:.4f} (gap {gap:+.4f}; "
+              f"streaming estimate {evaluation.auc():.4f})")
+
+
+if __name__ == '__main__':
+    main()
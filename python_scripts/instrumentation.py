@@ -0,0 +1,300 @@
+"""
+========================================================================
+FRAUD DETECTION - SECTION INSTRUMENTATION
+========================================================================
+Purpose: Per-section wall time, CPU time, peak memory growth and rows
+         processed for the numbered sections of every script
+Usage: with section('[4] Payment method risk', rows=len(df)): ...
+       or @section('fit') on a function
+Profiling: opt-in cProfile / tracemalloc per section, via --profile or
+           FRAUD_PROFILE=cprofile,tracemalloc
+Output: --trace / FRAUD_TRACE = run.json (one run), runs.jsonl (appended)
+        or sections.csv (appended, one row per section)
+========================================================================
+"""
+
+import argparse
+import atexit
+import contextlib
+import cProfile
+import csv
+import io
+import json
+import os
+import platform
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TRACE_ENV = 'FRAUD_TRACE'
+PROFILE_ENV = 'FRAUD_PROFILE'
+PROFILERS = ('cprofile', 'tracemalloc')
+CSV_FIELDS = ['run_id', 'script', 'started', 'section', 'depth', 'start_s', 'rows', 'wall_s', 'cpu_s',
+              'rows_per_s', 'rss_peak_delta_mb', 'py_peak_delta_mb']
+TOP_N = 5
+
+
+def _peak_rss_mb():
+    """Process high-water RSS in MB (None where getrusage is unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _slug(name):
+    return re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_').lower() or 'section'
+
+
+def parse_profilers(value):
+    """Profiler names from a comma-separated string ('all' enables both)."""
+    if not value:
+        return set()
+    names = {name.strip().lower() for name in value.split(',') if name.strip()}
+    if 'all' in names:
+        return set(PROFILERS)
+    unknown = names - set(PROFILERS)
+    if unknown:
+        raise ValueError(f"Unknown profiler(s) {sorted(unknown)}; choose from {PROFILERS}")
+    return names
+
+
+class Tracer:
+    """Collects one record per section of a run and writes them as a trace."""
+
+    def __init__(self, script, trace_path=None, profile=()):
+        self.script = script
+        self.trace_path = trace_path
+        self.profile = set(profile)
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.records = []
+        self._local = threading.local()
+        self._start = time.perf_counter()
+        if 'tracemalloc' in self.profile and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @property
+    def _stack(self):
+        # Per thread, so sections run concurrently on a thread pool nest correctly
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def section(self, name, rows=None):
+        """Time a block; the yielded record can be updated (e.g. ``record['rows'] = n``).
+
+        ``cpu_s`` is this process only, so work done in worker processes shows
+        up as wall time without matching CPU time. Both ``cpu_s`` and the
+        tracemalloc peak are process-wide: sections running at the same time
+        on other threads (exploratory_analysis.py --jobs) are counted in each
+        other's CPU time, and a profiled run must keep its sections serial.
+        """
+        parent = self._stack[-1] if self._stack else None
+        record = {'section': name if parent is None else f"{parent['section']} / {name}",
+                  'depth': len(self._stack), 'rows': rows}
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                # reset_peak() below would lose the parent's peak so far
+                parent['_py_peak'] = max(parent['_py_peak'], peak)
+            tracemalloc.reset_peak()
+            record['_py_start'], record['_py_peak'] = current, current
+            snapshot = tracemalloc.take_snapshot() if 'tracemalloc' in self.profile else None
+        profiler = None
+        if 'cprofile' in self.profile and parent is None:
+            profiler = cProfile.Profile()
+
+        self._stack.append(record)
+        rss_start = _peak_rss_mb()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        record['start_s'] = round(wall_start - self._start, 6)
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_s'] = round(time.perf_counter() - wall_start, 6)
+            record['cpu_s'] = round(time.process_time() - cpu_start, 6)
+            rss_end = _peak_rss_mb()
+            record['rss_peak_delta_mb'] = None if rss_end is None else round(rss_end - rss_start, 2)
+            record['rows_per_s'] = (round(record['rows'] / record['wall_s'], 1)
+                                    if record['rows'] and record['wall_s'] > 0 else None)
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, record.pop('_py_peak'))
+                record['py_peak_delta_mb'] = round((peak - record.pop('_py_start')) / 2 ** 20, 2)
+                if parent is not None:
+                    parent['_py_peak'] = max(parent['_py_peak'], peak)
+                if snapshot is not None:
+                    diff = tracemalloc.take_snapshot().compare_to(snapshot, 'lineno')[:TOP_N]
+                    record['top_allocations'] = [str(stat) for stat in diff]
+            if profiler is not None:
+                record['top_functions'] = self._dump_profile(profiler, record['section'])
+            self._stack.pop()
+            self.records.append(record)
+
+    def _dump_profile(self, profiler, name):
+        if self.trace_path:
+            stem = os.path.splitext(self.trace_path)[0]
+            profiler.dump_stats(f"{stem}.{self.run_id}.{_slug(name)}.prof")
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(TOP_N)
+        lines = [line.strip() for line in out.getvalue().splitlines()]
+        header = next((i for i, line in enumerate(lines) if line.startswith('ncalls')), None)
+        return [line for line in lines[header + 1:] if line] if header is not None else []
+
+    def run_summary(self):
+        return {
+            'run_id': self.run_id,
+            'script': self.script,
+            'started': self.started,
+            'argv': sys.argv[1:],
+            'python': platform.python_version(),
+            'profile': sorted(self.profile),
+            'total_wall_s': round(time.perf_counter() - self._start, 6),
+            'sections': sorted(self.records, key=lambda record: record['start_s']),
+        }
+
+    def write(self, path=None):
+        """Write the trace; .json = this run, .jsonl = append run, .csv = append sections."""
+        path = path or self.trace_path
+        if not path:
+            return None
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if path.endswith('.csv'):
+            new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+            with open(path, 'a', newline='') as fh:
+                writer = csv.DictWriter(fh, fieldnames=CSV_FIELDS, extrasaction='ignore')
+                if new_file:
+                    writer.writeheader()
+                for record in sorted(self.records, key=lambda record: record['start_s']):
+                    writer.writerow({'run_id': self.run_id, 'script': self.script,
+                                     'started': self.started, **record})
+        elif path.endswith('.jsonl'):
+            with open(path, 'a') as fh:
+                fh.write(json.dumps(self.run_summary()) + '\n')
+        else:
+            with open(path, 'w') as fh:
+                json.dump(self.run_summary(), fh, indent=2)
+        return path
+
+
+_tracer = None
+
+
+def configure(script, trace_path=None, profile=None):
+    """Set up the process-wide tracer; CLI values win over the environment.
+
+    The trace is written at interpreter exit so every script gets it without
+    changes to its control flow.
+    """
+    global _tracer
+    trace_path = trace_path or os.environ.get(TRACE_ENV)
+    profilers = parse_profilers(profile if profile is not None else os.environ.get(PROFILE_ENV))
+    _tracer = Tracer(script, trace_path, profilers)
+    atexit.register(_write_at_exit, _tracer)
+    return _tracer
+
+
+def _write_at_exit(tracer):
+    path = tracer.write()
+    if path:
+        print(f"Section trace saved as '{path}'", file=sys.stderr)
+
+
+def get_tracer():
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(os.path.basename(sys.argv[0]) or 'python')
+    return _tracer
+
+
+class _Section(contextlib.ContextDecorator):
+    """What section() returns; the tracer is looked up on every entry.
+
+    A decorator is created at import time, before configure() installs the
+    run's tracer, so binding a tracer up front would record into a
+    throwaway one.
+    """
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self._local = threading.local()  # open contexts, per thread (recursion / concurrent calls)
+
+    def __enter__(self):
+        context = get_tracer().section(self.name, self.rows)
+        self._local.__dict__.setdefault('contexts', []).append(context)
+        return context.__enter__()
+
+    def __exit__(self, *exc):
+        return self._local.contexts.pop().__exit__(*exc)
+
+
+def section(name, rows=None):
+    """Context manager / decorator timing a section with the process-wide tracer."""
+    return _Section(name, rows)
+
+
+def add_instrumentation_args(parser):
+    parser.add_argument('--trace', default=None,
+                        help=f"Write a section trace (.json, .jsonl or .csv); env {TRACE_ENV}")
+    parser.add_argument('--profile', default=None,
+                        help=f"Per-section profilers: cprofile, tracemalloc or all; env {PROFILE_ENV}")
+    return parser
+
+
+def section_regressions(baseline, current, tolerance=0.25, min_seconds=0.05):
+    """(section, baseline_s, current_s, change) for sections slower by more than ``tolerance``.
+
+    Sections shorter than ``min_seconds`` in both runs are ignored as noise.
+    """
+    before = {record['section']: record['wall_s'] for record in baseline['sections']}
+    regressions = []
+    for record in current['sections']:
+        old, new = before.get(record['section']), record['wall_s']
+        if old is None or max(old, new) < min_seconds or old <= 0:
+            continue
+        change = new / old - 1
+        if change > tolerance:
+            regressions.append((record['section'], old, new, change))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare two section traces (.json)")
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--min-seconds', type=float, default=0.05)
+    args = parser.parse_args()
+
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    with open(args.current) as fh:
+        current = json.load(fh)
+
+    slower = section_regressions(baseline, current, args.tolerance, args.min_seconds)
+    for name, old, new, change in slower:
+        print(f"REGRESSION {name}: {old:.3f}s -> {new:.3f}s ({change:+.1%})")
+    if not slower:
+        print(f"No section slower than {args.tolerance:.0%} of the baseline")
+    sys.exit(1 if slower else 0)
@@ -0,0 +1,248 @@
+"""
+========================================================================
+FRAUD DETECTION - ROLLUP CUBE
+========================================================================
+Purpose: Materialized aggregates shared by the EDA and the SQL reports
+Grain: (day, hour, payment_method, category, fraud)
+Measures: txn_count, amount_count, amount_sum, amount_min, amount_max
+Backend: SQLite file (attached as schema "credit" for the SQL files)
+========================================================================
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from columnar_store import to_typed
+from segment_risk import SEGMENT_COLUMNS, day_number, fraud_flags, group_codes, hour_of_day
+
+CUBE_DIMENSIONS = ['day', 'hour', 'payment_method', 'category', 'fraud']
+CUBE_MEASURES = ['txn_count', 'amount_count', 'amount_sum', 'amount_min', 'amount_max']
+CUBE_TABLE = 'fraud_cube'
+RAW_TABLE = 'cleaned_fraud'
+SQL_SCHEMA = 'credit'
+
+
+def _rollup(frame, keys, dropna):
+    """Re-aggregate measure columns of ``frame`` by ``keys``."""
+    codes, index = group_codes(frame, keys, dropna=dropna)
+    n_groups = len(index)
+    valid = codes >= 0
+    group = codes[valid]
+
+    rolled = index.to_frame(index=False)
+    rolled['txn_count'] = np.bincount(
+        group, weights=frame['txn_count'].to_numpy()[valid], minlength=n_groups).astype(np.int64)
+    rolled['amount_count'] = np.bincount(
+        group, weights=frame['amount_count'].to_numpy()[valid], minlength=n_groups).astype(np.int64)
+    rolled['amount_sum'] = np.bincount(
+        group, weights=frame['amount_sum'].to_numpy()[valid], minlength=n_groups)
+    for column, reduce in [('amount_min', np.fmin), ('amount_max', np.fmax)]:
+        values = np.full(n_groups, np.nan)
+        reduce.at(values, group, frame[column].to_numpy(dtype=np.float64, na_value=np.nan)[valid])
+        rolled[column] = values
+    return rolled
+
+
+def build_cube(df):
+    """Build the cube from cleaned transaction rows (typed or YES/NO labels).
+
+    Missing dimension values are kept as their own cells so the cube still
+    reproduces whole-table totals.
+    """
+    typed = to_typed(df[['time', 'payment_method', 'category', 'amount', 'fraud']])
+    amounts = typed['amount'].to_numpy(dtype=np.float64, na_value=np.nan)
+    rows = pd.DataFrame({
+        'day': day_number(typed['time']),
+        'hour': hour_of_day(typed['time']),
+        'payment_method': typed['payment_method'],
+        'category': typed['category'],
+        'fraud': typed['fraud'],
+        'txn_count': 1,
+        'amount_count': ~np.isnan(amounts),
+        'amount_sum': np.nan_to_num(amounts),
+        'amount_min': amounts,
+        'amount_max': amounts,
+    })
+    return _rollup(rows, CUBE_DIMENSIONS, dropna=False)
+
+
+def merge_cubes(cubes):
+    """Combine cubes built from disjoint batches of rows into one cube."""
+    combined = pd.concat(cubes, ignore_index=True)
+    for column in ['payment_method', 'category']:
+        combined[column] = combined[column].astype('category')
+    return _rollup(combined, CUBE_DIMENSIONS, dropna=False)
+
+
+def cube_report(cube, keys):
+    """Segment risk table for ``keys`` answered from the cube.
+
+    Returns the segment_risk columns plus Fraud_Amount, Min_Amount and
+    Max_Amount; missing key values are dropped as groupby would.
+    """
+    codes, index = group_codes(cube, keys)
+    n_groups = len(index)
+    valid = codes >= 0
+    group = codes[valid]
+
+    is_fraud = fraud_flags(cube['fraud'])[valid]
+    txn_count = cube['txn_count'].to_numpy()[valid]
+    amount_sum = cube['amount_sum'].to_numpy()[valid]
+    amount_count = cube['amount_count'].to_numpy()[valid]
+
+    transactions = np.bincount(group, weights=txn_count, minlength=n_groups).astype(np.int64)
+    fraud_count = np.bincount(group[is_fraud], weights=txn_count[is_fraud], minlength=n_groups).astype(np.int64)
+    total_amount = np.bincount(group, weights=amount_sum, minlength=n_groups)
+    amount_n = np.bincount(group, weights=amount_count, minlength=n_groups)
+    fraud_amount = np.bincount(group[is_fraud], weights=amount_sum[is_fraud], minlength=n_groups)
+    extremes = _rollup(cube[valid].assign(_group=group), ['_group'], dropna=True)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        report = pd.DataFrame({
+            'Total_Transactions': transactions,
+            'Fraud_Count': fraud_count,
+            'Fraud_Rate_%': fraud_count / transactions * 100,
+            'Avg_Amount': np.where(amount_n > 0, total_amount / amount_n, np.nan),
+            'Total_Amount': total_amount,
+            'Fraud_Amount': fraud_amount,
+            'Min_Amount': extremes['amount_min'].to_numpy(),
+            'Max_Amount': extremes['amount_max'].to_numpy(),
+        }, index=index)
+    return report[SEGMENT_COLUMNS + ['Fraud_Amount', 'Min_Amount', 'Max_Amount']]
+
+
+def _sql_frame(frame):
+    """Frame with SQL-friendly values: YES/NO fraud labels and None for missing."""
+    out = frame.copy()
+    if 'fraud' in out:
+        out['fraud'] = out['fraud'].map({True: 'YES', False: 'NO'})
+    out = out.astype(object)
+    return out.where(out.notna(), None)
+
+
+def write_sqlite(db_path, cube, df=None, chunksize=100_000):
+    """Store the cube (and optionally the raw cleaned rows) in a SQLite file.
+
+    The raw table is only needed for the user- and device-level reports,
+    which are finer than the cube grain.
+    """
+    with sqlite3.connect(db_path) as conn:
+        _sql_frame(cube).to_sql(CUBE_TABLE, conn, if_exists='replace', index=False)
+    if df is not None:
+        append_raw(db_path, df, replace=True, chunksize=chunksize)
+
+
+def append_raw(db_path, df, replace=False, chunksize=100_000):
+    """Append cleaned rows to the raw table (dropping it first if ``replace``)."""
+    with sqlite3.connect(db_path) as conn:
+        if replace:
+            conn.execute(f'DROP TABLE IF EXISTS {RAW_TABLE}')
+        for start in range(0, len(df), chunksize):
+            part = to_typed(df.iloc[start:start + chunksize])
+            _sql_frame(part).to_sql(RAW_TABLE, conn, if_exists='append', index=False)
+
+
+def create_cube_table(conn):
+    """The cube table with a ``cell`` key for upsert_cube(), if it does not exist yet."""
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {CUBE_TABLE} (cell TEXT PRIMARY KEY, day INTEGER, '
+                 'hour INTEGER, payment_method TEXT, category TEXT, fraud TEXT, '
+                 'txn_count INTEGER NOT NULL, amount_count INTEGER NOT NULL, amount_sum REAL NOT NULL, '
+                 'amount_min REAL, amount_max REAL)')
+
+
+def upsert_cube(conn, cube):
+    """Add the cells of ``cube`` to the cube table of an open connection.
+
+    Cells are matched on ``cell``, the JSON list of the five dimension
+    values: a composite key would treat cells with a missing dimension as
+    all distinct. Only the cells of ``cube`` are read or written.
+    """
+    create_cube_table(conn)
+    frame = _sql_frame(cube[CUBE_DIMENSIONS + CUBE_MEASURES])
+    columns = [[value.item() if isinstance(value, np.generic) else value for value in frame[column]]
+               for column in CUBE_DIMENSIONS + CUBE_MEASURES]
+    rows = [(json.dumps(row[:len(CUBE_DIMENSIONS)]), *row) for row in zip(*columns)]
+    sums = [f'{column} = {column} + excluded.{column}'
+            for column in ['txn_count', 'amount_count', 'amount_sum']]
+    # min()/max() of SQLite return NULL if either side is NULL (a cell with no amounts yet)
+    extremes = [f'{column} = coalesce({reduce}({column}, excluded.{column}), {column}, excluded.{column})'
+                for column, reduce in [('amount_min', 'min'), ('amount_max', 'max')]]
+    names = ['cell'] + CUBE_DIMENSIONS + CUBE_MEASURES
+    conn.executemany(f'INSERT INTO {CUBE_TABLE} ({", ".join(names)}) VALUES ({", ".join("?" * len(names))}) '
+                     f'ON CONFLICT(cell) DO UPDATE SET {", ".join(sums + extremes)}', rows)
+
+
+def read_cube(db_path):
+    with sqlite3.connect(db_path) as conn:
+        cube = pd.read_sql_query(f'SELECT {", ".join(CUBE_DIMENSIONS + CUBE_MEASURES)} FROM {CUBE_TABLE}', conn)
+    cube['fraud'] = cube['fraud'].map({'YES': True, 'NO': False}).astype('boolean')
+    return cube.astype({'day': 'Int32', 'hour': 'Int8', 'payment_method': 'category',
+                        'category': 'category'})
+
+
+def sql_statements(sql_text):
+    """Split a SQL file into statements, dropping comments."""
+    sql_text = re.sub(r'/\*.*?\*/', '', sql_text, flags=re.S)
+    sql_text = re.sub(r'--[^\n]*', '', sql_text)
+    return [statement.strip() for statement in sql_text.split(';') if statement.strip()]
+
+
+def run_sql_file(db_path, sql_path):
+    """Run every query of ``sql_path`` against the SQLite file, yielding result frames.
+
+    The file is attached under the "credit" schema so queries written for
+    ``credit.cleaned_fraud`` / ``credit.fraud_cube`` run unchanged. A query
+    whose table is not in the file (e.g. the raw table of a cube built
+    without --with-raw) yields ``None`` instead of a frame.
+    """
+    conn = sqlite3.connect(':memory:')
+    conn.create_function('FLOOR', 1, lambda x: None if x is None else float(np.floor(x)),
+                         deterministic=True)
+    conn.execute(f"ATTACH DATABASE ? AS {SQL_SCHEMA}", (db_path,))
+    try:
+        with open(sql_path) as fh:
+            for statement in sql_statements(fh.read()):
+                try:
+                    yield statement, pd.read_sql_query(statement, conn)
+                except pd.errors.DatabaseError as exc:
+                    if 'no such table' not in str(exc):
+                        raise
+                    yield statement, None
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    from columnar_store import load_cleaned
+
+    parser = argparse.ArgumentParser(description="Build or query the fraud rollup cube")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="Build the cube from the cleaned data")
+    build.add_argument('--data', default='cleaned_fraud_data.csv')
+    build.add_argument('--db', default='fraud_eda.sqlite')
+    build.add_argument('--with-raw', action='store_true',
+                       help="Also store the raw rows (needed by the user/device queries)")
+
+    query = subparsers.add_parser('query', help="Run a SQL file against the SQLite backend")
+    query.add_argument('--db', default='fraud_eda.sqlite')
+    query.add_argument('--sql', default='sql_queries/fraud_eda_cube.sql')
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        df = load_cleaned(args.data)
+        cube = build_cube(df)
+        write_sqlite(args.db, cube, df if args.with_raw else None)
+        print(f"Cube with {len(cube):,} cells from {cube['txn_count'].sum():,} rows saved to '{args.db}'")
+    else:
+        for number, (statement, result) in enumerate(run_sql_file(args.db, args.sql), 1):
+            print(f"\n-- QUERY {number}")
+            if result is None:
+                print(f"Skipped: needs the raw '{RAW_TABLE}' table (rebuild with: build --with-raw)")
+            else:
+                print(result.to_string(index=False))
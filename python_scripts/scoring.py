@@ -0,0 +1,652 @@
+"""
+========================================================================
+FRAUD DETECTION - SCORING ARTIFACT & REAL-TIME SCORING
+========================================================================
+Purpose: One serializable object holding everything needed to score a
+         transaction: label encoders, scaler, derived features, model
+Method: score_one() works on plain dicts and lists (no DataFrames); tree
+        ensembles and linear models are compiled to flat node lists
+Velocity: optional user/device velocity features (velocity_features.py)
+Entry points: serve (HTTP), stdin (JSON lines), bench (p50/p99 latency);
+              --monitor adds sliding-window drift reports (drift_monitor.py)
+Startup: loading an artifact does not import pandas or sklearn; the fitted
+         model is only unpickled when a batch method needs it
+========================================================================
+"""
+
+import argparse
+import array
+import json
+import math
+import pickle
+import sys
+import time
+import warnings
+from collections import deque
+
+import joblib
+import numpy as np
+
+from velocity_features import VELOCITY_COLUMNS, VelocityState, velocity_features
+
+RAW_COLUMNS = ['user_id', 'amount', 'payment_method', 'category', 'device_id', 'time']
+CATEGORICAL_COLUMNS = ['payment_method', 'category']
+DERIVED_COLUMNS = ['amount_log', 'time_hour', 'time_day']
+FEATURE_COLUMNS = RAW_COLUMNS + DERIVED_COLUMNS
+DEFAULT_ARTIFACT = 'fraud_scoring_model.joblib'
+# Latencies kept by LatencyTracker for its percentiles
+LATENCY_WINDOW = 100_000
+
+
+def add_features(df):
+    """Append the derived model features to ``df`` in place and return it."""
+    df['amount_log'] = np.log1p(df['amount'])
+    df['time_hour'] = (df['time'] // 3600) % 24
+    df['time_day'] = (df['time'] // 86400) % 7
+    return df
+
+
+def model_frame(df):
+    """Frame the models train on: ``(frame, label encoders, excluded-row mask)``.
+
+    Rows the models cannot use (unlabelled, incomplete, or negative amounts,
+    which have no log) are excluded; fraud becomes 0/1, the categoricals are
+    label-encoded and the derived features are appended.
+    """
+    from sklearn.preprocessing import LabelEncoder
+
+    unusable = df.isna().any(axis=1) | (df['amount'] < 0).fillna(False)
+    frame = df[~unusable].copy()
+    frame['fraud'] = frame['fraud'].astype(int)
+    encoders = {}
+    for column in CATEGORICAL_COLUMNS:
+        encoders[column] = LabelEncoder()
+        frame[column] = encoders[column].fit_transform(frame[column])
+    return add_features(frame), encoders, unusable
+
+
+def _number(value):
+    """float(value), with None / NA / unparseable values as NaN."""
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _sigmoid(raw):
+    if raw >= 0:
+        return 1.0 / (1.0 + math.exp(-raw))
+    z = math.exp(raw)
+    return z / (1.0 + z)
+
+
+# ======================== COMPILED MODELS ========================
+
+def _flat_sklearn_tree(tree, leaf_value):
+    """Node lists for a fitted sklearn ``Tree``; ``leaf_value`` maps tree.value to floats."""
+    return (tree.children_left.tolist(), tree.children_right.tolist(), tree.feature.tolist(),
+            tree.threshold.tolist(), tree.missing_go_to_left.astype(bool).tolist(),
+            leaf_value(tree.value).tolist(), {})
+
+
+def _flat_hist_tree(predictor, known_categories, feature_map):
+    """Node lists for one HistGradientBoosting predictor, categorical splits as sets."""
+    nodes = predictor.nodes
+    left = np.where(nodes['is_leaf'], -1, nodes['left'].astype(np.int64)).tolist()
+    categorical = {}
+    for node in np.flatnonzero(nodes['is_categorical'] & ~nodes['is_leaf'].astype(bool)):
+        words = predictor.raw_left_cat_bitsets[nodes['bitset_idx'][node]]
+        known = known_categories[feature_map[nodes['feature_idx'][node]]]
+        categorical[int(node)] = (_bitset_members(words), _bitset_members(known))
+    return (left, nodes['right'].tolist(), nodes['feature_idx'].tolist(),
+            nodes['num_threshold'].tolist(), nodes['missing_go_to_left'].astype(bool).tolist(),
+            nodes['value'].tolist(), categorical)
+
+
+def _bitset_members(words):
+    return frozenset(int(c) for c in range(len(words) * 32) if (int(words[c >> 5]) >> (c & 31)) & 1)
+
+
+def _leaf(tree, x):
+    left, right, feature, threshold, missing_left, value, categorical = tree
+    node = 0
+    while left[node] >= 0:
+        v = x[feature[node]]
+        if v != v:
+            go_left = missing_left[node]
+        elif node in categorical:
+            left_set, known = categorical[node]
+            code = int(v)
+            if v >= 0 and code in left_set:
+                go_left = True
+            elif v >= 0 and code in known:
+                go_left = False
+            else:
+                go_left = missing_left[node]  # unknown category is treated as missing
+        else:
+            go_left = v <= threshold[node]
+        node = left[node] if go_left else right[node]
+    return value[node]
+
+
+class _LinearScorer:
+    def __init__(self, model, scaler):
+        coef = model.coef_[0].astype(np.float64)
+        intercept = float(model.intercept_[0])
+        if scaler is not None:
+            # Fold the standardization into the weights: w·(x - m)/s = (w/s)·x - w·m/s
+            coef = coef / scaler.scale_
+            intercept -= float(coef @ scaler.mean_)
+        self.coef = coef.tolist()
+        self.intercept = intercept
+        self.float32 = False
+
+    def __call__(self, x):
+        raw = self.intercept
+        for w, v in zip(self.coef, x):
+            raw += w * v
+        return _sigmoid(raw)
+
+
+class _TreeEnsembleScorer:
+    def __init__(self, trees, combine, bias=0.0, float32=True, prepare=None):
+        self.trees = trees
+        self.combine = combine  # 'mean' (bagged probabilities) or 'sum' (boosted log-odds)
+        self.bias = bias
+        self.float32 = float32
+        self.prepare = prepare
+
+    def leaf_total(self, x):
+        if self.prepare is not None:
+            x = self.prepare(x)
+        total = 0.0
+        for tree in self.trees:
+            total += _leaf(tree, x)
+        return total
+
+    def __call__(self, x):
+        total = self.leaf_total(x)
+        if self.combine == 'mean':
+            return total / len(self.trees)
+        return _sigmoid(self.bias + total)
+
+
+class _FallbackScorer:
+    """Any other estimator: one predict_proba call on a 1-row ndarray (scaled first if needed)."""
+
+    def __init__(self, model, scaler=None):
+        self.model = model
+        self.scaler = scaler
+        self.float32 = False
+
+    def __call__(self, x):
+        X = np.array([x], dtype=np.float64)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)  # fitted with feature names
+            if self.scaler is not None:
+                X = self.scaler.transform(X)
+            return float(self.model.predict_proba(X)[0, 1])
+
+
+def _sklearn_version():
+    """Installed scikit-learn version, read without importing sklearn."""
+    from importlib import metadata
+
+    try:
+        return metadata.version('scikit-learn')
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _compile(model, scaler):
+    """Compiled scorer for ``model``, or a _FallbackScorer if it cannot be compiled.
+
+    The tree compilers read sklearn internals (tree node arrays, and for
+    HistGradientBoosting its predictors, bin mapper and preprocessor); when
+    a release renames or reshapes them, predict_proba is used instead.
+    """
+    try:
+        return _compile_model(model, scaler)
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError) as exc:
+        warnings.warn(f"Cannot compile {type(model).__name__} with scikit-learn {_sklearn_version()} "
+                      f"({exc!r}); scoring with predict_proba")
+        return _FallbackScorer(model, scaler)
+
+
+def _compile_model(model, scaler):
+    from sklearn.ensemble import (ExtraTreesClassifier, GradientBoostingClassifier,
+                                  HistGradientBoostingClassifier, RandomForestClassifier)
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+    logistic = isinstance(model, LogisticRegression) or (isinstance(model, SGDClassifier)
+                                                         and model.loss == 'log_loss')
+    if logistic and model.coef_.shape[0] == 1:
+        return _LinearScorer(model, scaler)
+    if scaler is not None:
+        return _FallbackScorer(model, scaler)
+
+    if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+        def positive_share(value):
+            counts = value[:, 0, :]
+            return counts[:, 1] / counts.sum(axis=1)
+        trees = [_flat_sklearn_tree(est.tree_, positive_share) for est in model.estimators_]
+        return _TreeEnsembleScorer(trees, 'mean')
+
+    if isinstance(model, GradientBoostingClassifier) and model.estimators_.shape[1] == 1:
+        rate = model.learning_rate
+        trees = [_flat_sklearn_tree(est.tree_, lambda value: value[:, 0, 0] * rate)
+                 for est in model.estimators_[:, 0]]
+        return _calibrate_bias(model, _TreeEnsembleScorer(trees, 'sum'))
+
+    if isinstance(model, HistGradientBoostingClassifier) and model.n_trees_per_iteration_ == 1:
+        known_categories, feature_map = model._bin_mapper.make_known_categories_bitsets()
+        trees = [_flat_hist_tree(predictors[0], known_categories, feature_map)
+                 for predictors in model._predictors]
+        scorer = _TreeEnsembleScorer(trees, 'sum', float32=False, prepare=_hist_preprocessor(model))
+        return _calibrate_bias(model, scorer)
+
+    return _FallbackScorer(model)
+
+
+def _calibrate_bias(model, scorer):
+    """Recover the boosting baseline from one decision_function call at compile time."""
+    x = [0.0] * model.n_features_in_
+    X = np.array([x])
+    if hasattr(model, 'feature_names_in_'):
+        import pandas as pd
+        X = pd.DataFrame(X, columns=model.feature_names_in_)
+    raw = float(model.decision_function(X)[0])
+    scorer.bias = raw - scorer.leaf_total(x)
+    return scorer
+
+
+class _HistPreprocessor:
+    """Plain-list version of the ordinal encoding HistGradientBoosting applies to
+    named categorical features (categorical columns first, unknown codes as NaN)."""
+
+    def __init__(self, categorical, numerical, ordinals):
+        self.categorical = categorical
+        self.numerical = numerical
+        self.ordinals = ordinals
+
+    def __call__(self, x):
+        return ([ordinal.get(x[i], math.nan) for i, ordinal in zip(self.categorical, self.ordinals)]
+                + [x[i] for i in self.numerical])
+
+
+def _hist_preprocessor(model):
+    preprocessor = getattr(model, '_preprocessor', None)
+    if preprocessor is None:
+        return None
+    (_, encoder, categorical), (_, _, numerical) = preprocessor.transformers_[:2]
+    ordinals = [{float(value): float(i) for i, value in enumerate(categories)}
+                for categories in encoder.categories_]
+    return _HistPreprocessor(np.flatnonzero(categorical).tolist(),
+                             np.flatnonzero(numerical).tolist(), ordinals)
+
+
+# ======================== ARTIFACT ========================
+
+class ScoringArtifact:
+    """Fitted feature pipeline + model, scoring raw transaction dicts or frames.
+
+    ``encoders`` maps each categorical column to its fitted LabelEncoder;
+    labels not seen in training are encoded as -1. ``scaler`` is only given
+    when the model was trained on standardized features. With ``velocity``
+    the model also uses VELOCITY_COLUMNS; transactions that do not carry them
+    are run through the artifact's VelocityState. The state is saved with the
+    artifact, so warm_start() it from the training history (or more recent
+    transactions) first: an empty state would give every user and device
+    counts of 0 that the training features never had.
+
+    Compiled tree scorers depend on sklearn internals, so the sklearn version
+    they were compiled with is saved too; under any other version the
+    artifact scores with the model's predict_proba instead.
+
+    The compiled scorer is saved as is; the fitted model and scaler are saved
+    as a separate pickle that is only loaded (importing sklearn) on first use
+    of ``model`` / ``scaler``, so the single-transaction path starts fast.
+    """
+
+    def __init__(self, model, encoders, scaler=None, model_name=None, threshold=0.5, velocity=False):
+        self._model = model
+        self._scaler = scaler
+        self._fitted_blob = None
+        self.model_name = model_name or type(model).__name__
+        self.threshold = threshold
+        self.velocity = velocity
+        self.categories = {column: [str(label) for label in encoder.classes_]
+                           for column, encoder in encoders.items()}
+        self.sklearn_version = _sklearn_version()
+        self._scorer = _compile(model, scaler)
+        self._build_lookup()
+        self.reset_velocity()
+
+    def _build_lookup(self):
+        self._codes = {column: {label: code for code, label in enumerate(labels)}
+                       for column, labels in self.categories.items()}
+
+    def reset_velocity(self):
+        """Start the streaming velocity state empty."""
+        self.velocity_state = VelocityState() if self.velocity else None
+
+    def warm_start(self, df):
+        """Replay past transactions (user_id, device_id, time, amount) into a fresh velocity state.
+
+        Keys idle at the end of ``df`` are evicted, so the saved state only
+        holds the recently active users and devices.
+        """
+        self.reset_velocity()
+        if self.velocity and len(df):
+            self.velocity_state.process(df)
+            self.velocity_state.evict(float(np.nanmax(df['time'].to_numpy(dtype=np.float64, na_value=np.nan))))
+        return self
+
+    def _load_fitted(self):
+        if self._fitted_blob is not None:
+            self._model, self._scaler = pickle.loads(self._fitted_blob)
+            self._fitted_blob = None
+
+    @property
+    def model(self):
+        self._load_fitted()
+        return self._model
+
+    @property
+    def scaler(self):
+        self._load_fitted()
+        return self._scaler
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_codes']
+        if state['_fitted_blob'] is None:
+            state['_fitted_blob'] = pickle.dumps((self._model, self._scaler),
+                                                 protocol=pickle.HIGHEST_PROTOCOL)
+        state['_model'] = state['_scaler'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_lookup()
+        if 'velocity_state' not in state:
+            self.reset_velocity()
+        installed = _sklearn_version()
+        if isinstance(self._scorer, _TreeEnsembleScorer) and state.get('sklearn_version') != installed:
+            warnings.warn(f"Artifact compiled with scikit-learn {state.get('sklearn_version')}, running "
+                          f"{installed}; scoring with predict_proba (rebuild the artifact to recompile)")
+            self._scorer = _FallbackScorer(self.model, self.scaler)
+
+    # ---------------- single transaction ----------------
+
+    def features(self, transaction):
+        """Model feature vector (list of floats, FEATURE_COLUMNS order) for one dict.
+
+        Velocity features, when used, are appended from the dict itself or,
+        if absent, from the streaming state (which then records the transaction).
+        """
+        get = transaction.get
+        amount = _number(get('amount'))
+        t = _number(get('time'))
+        row = [
+            _number(get('user_id')),
+            amount,
+            float(self._codes['payment_method'].get(get('payment_method'), -1)),
+            float(self._codes['category'].get(get('category'), -1)),
+            _number(get('device_id')),
+            t,
+            math.log1p(amount) if amount > -1 else math.nan,
+            (t // 3600) % 24,
+            (t // 86400) % 7,
+        ]
+        # amount / amount_log are float32 in the typed dataset: round them the
+        # same way so single transactions hit the same tree splits as training
+        row[1], row[6] = array.array('f', (row[1], row[6])).tolist()
+        if self.velocity:
+            if VELOCITY_COLUMNS[0] not in transaction:
+                transaction = self.velocity_state.update(
+                    get('user_id'), get('device_id'), t, amount)
+            row.extend(_number(transaction.get(column)) for column in VELOCITY_COLUMNS)
+        return row
+
+    def score_one(self, transaction):
+        """Fraud probability for one transaction dict."""
+        x = self.features(transaction)
+        if self._scorer.float32:
+            x = array.array('f', x).tolist()
+        return self._scorer(x)
+
+    def predict_one(self, transaction):
+        return self.score_one(transaction) >= self.threshold
+
+    # ---------------- batches ----------------
+
+    def feature_frame(self, df):
+        """Model features for a frame of raw transactions, encoded like training.
+
+        Missing velocity columns are computed offline over the whole frame.
+        """
+        import pandas as pd
+
+        out = pd.DataFrame(index=df.index)
+        for column in RAW_COLUMNS:
+            if column in CATEGORICAL_COLUMNS:
+                codes = pd.Categorical(df[column].astype(object), categories=self.categories[column]).codes
+                out[column] = codes.astype(np.int64)
+            else:
+                out[column] = df[column]
+        add_features(out)
+        if self.velocity:
+            velocity = df[VELOCITY_COLUMNS] if VELOCITY_COLUMNS[0] in df else velocity_features(df)
+            out = out.join(velocity)
+        return out
+
+    def score_batch(self, df):
+        """Fraud probabilities for a frame (or list of dicts) of raw transactions."""
+        import pandas as pd
+
+        if not isinstance(df, pd.DataFrame):
+            df = pd.DataFrame(list(df), columns=RAW_COLUMNS)
+        X = self.feature_frame(df)
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return self.model.predict_proba(X)[:, 1]
+
+    def save(self, path=DEFAULT_ARTIFACT):
+        joblib.dump(self, path)
+
+
+def load_artifact(path=DEFAULT_ARTIFACT, history=None):
+    """Load an artifact; ``history`` (a frame of recent transactions) re-warms its velocity state."""
+    artifact = joblib.load(path)
+    if history is not None:
+        artifact.warm_start(history)
+    return artifact
+
+
+# ======================== LATENCY ========================
+
+class LatencyTracker:
+    """Per-call latencies with p50/p99 summaries (in microseconds).
+
+    Only the last ``window`` latencies are kept, so a long-running server
+    uses constant memory; ``calls`` still counts every call.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.calls = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.calls += 1
+
+    def summary(self):
+        if not self.samples:
+            return {'calls': 0}
+        micros = np.asarray(self.samples) * 1e6
+        return {'calls': self.calls, 'window': len(micros),
+                'p50_us': round(float(np.percentile(micros, 50)), 1),
+                'p99_us': round(float(np.percentile(micros, 99)), 1),
+                'max_us': round(float(micros.max()), 1)}
+
+
+def _timed_score(artifact, transaction, tracker):
+    start = time.perf_counter()
+    probability = artifact.score_one(transaction)
+    tracker.record(time.perf_counter() - start)
+    return {'fraud_probability': probability, 'fraud': probability >= artifact.threshold}
+
+
+def _monitored_score(artifact, transaction, tracker, monitor):
+    result = _timed_score(artifact, transaction, tracker)
+    if monitor is not None:
+        report = monitor.update(transaction, result['fraud_probability'])
+        if report is not None and report['status'] != 'ok':
+            from drift_monitor import format_report
+
+            print(format_report(report), file=sys.stderr)
+    return result
+
+
+def serve(artifact, host='127.0.0.1', port=8080, monitor=None):
+    """POST /score with one transaction (or a list); GET /latency for p50/p99.
+
+    GET /drift returns the current drift report when a monitor is attached.
+    """
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    tracker = LatencyTracker()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path != '/score':
+                return self._reply(404, {'error': 'not found'})
+            try:
+                length = int(self.headers.get('Content-Length', ''))
+                if length < 0:
+                    raise ValueError(f"negative Content-Length {length}")
+                payload = json.loads(self.rfile.read(length))
+            except ValueError as exc:  # missing / malformed Content-Length or invalid JSON
+                return self._reply(400, {'error': str(exc)})
+            # Checked before scoring anything, so a bad list leaves the velocity state untouched
+            if not (isinstance(payload, dict)
+                    or isinstance(payload, list) and all(isinstance(txn, dict) for txn in payload)):
+                return self._reply(400, {'error': 'expected a transaction object or a list of them'})
+            if isinstance(payload, list):
+                self._reply(200, [_monitored_score(artifact, txn, tracker, monitor) for txn in payload])
+            else:
+                self._reply(200, _monitored_score(artifact, payload, tracker, monitor))
+
+        def do_GET(self):
+            if self.path == '/latency':
+                return self._reply(200, tracker.summary())
+            if self.path == '/drift' and monitor is not None:
+                return self._reply(200, monitor.report())
+            self._reply(404, {'error': 'not found'})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer((host, port), Handler)
+    print(f"Scoring {artifact.model_name} on http://{host}:{port}/score", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Latency: {tracker.summary()}", file=sys.stderr)
+
+
+def score_stdin(artifact, lines=None, out=None, monitor=None):
+    """Score JSON-lines transactions, one result line per input line.
+
+    ``lines`` and ``out`` default to the current sys.stdin / sys.stdout.
+    With a DriftMonitor, a drift report goes to stderr whenever a window
+    pane closes with a warning or alert.
+    """
+    lines = sys.stdin if lines is None else lines
+    out = sys.stdout if out is None else out
+    tracker = LatencyTracker()
+    for line in lines:
+        if line.strip():
+            out.write(json.dumps(_monitored_score(artifact, json.loads(line), tracker, monitor)) + '\n')
+    print(f"Latency: {tracker.summary()}", file=sys.stderr)
+    return tracker
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Score transactions with a saved artifact")
+    parser.add_argument('--artifact', default=DEFAULT_ARTIFACT)
+    parser.add_argument('--monitor', default=None, metavar='REFERENCE',
+                        help="Track drift against a drift_monitor.py reference (serve, stdin)")
+    parser.add_argument('--drift-window', type=int, default=10_000,
+                        help="Transactions in the sliding drift window")
+    parser.add_argument('--history', default=None, metavar='DATA',
+                        help="Warm the velocity state from these recent transactions instead of the saved state")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    http_parser = subparsers.add_parser('serve', help="Local HTTP scoring endpoint")
+    http_parser.add_argument('--host', default='127.0.0.1')
+    http_parser.add_argument('--port', type=int, default=8080)
+
+    subparsers.add_parser('stdin', help="Score JSON lines from stdin")
+
+    bench = subparsers.add_parser('bench', help="Single-transaction latency on cleaned data")
+    bench.add_argument('--data', default='cleaned_fraud_data.csv')
+    bench.add_argument('--rows', type=int, default=10_000)
+
+    args = parser.parse_args(argv)
+    history = None
+    if args.history:
+        from columnar_store import load_cleaned
+
+        history = load_cleaned(args.history, columns=['user_id', 'device_id', 'time', 'amount'])
+    artifact = load_artifact(args.artifact, history)
+    monitor = None
+    if args.monitor:
+        from drift_monitor import DriftMonitor, DriftReference
+
+        monitor = DriftMonitor(DriftReference.load(args.monitor), window=args.drift_window)
+
+    if args.command == 'serve':
+        serve(artifact, args.host, args.port, monitor)
+    elif args.command == 'stdin':
+        score_stdin(artifact, monitor=monitor)
+    else:
+        from columnar_store import load_cleaned
+
+        df = load_cleaned(args.data, columns=RAW_COLUMNS).head(args.rows)
+        # Time order, so the streaming velocity state sees what the offline pass sees
+        df = df.sort_values('time', kind='stable')
+        transactions = df.astype(object).where(df.notna(), None).to_dict('records')
+        # score_batch computes velocity over these rows alone; match it from an empty state
+        artifact.reset_velocity()
+
+        tracker = LatencyTracker()
+        single = np.array([_timed_score(artifact, txn, tracker)['fraud_probability']
+                           for txn in transactions])
+
+        start = time.perf_counter()
+        batch = artifact.score_batch(df)
+        batch_seconds = time.perf_counter() - start
+
+        print(f"Model: {artifact.model_name}")
+        print(f"score_one over {len(transactions):,} transactions: {tracker.summary()}")
+        print(f"score_batch: {len(df) / batch_seconds:,.0f} transactions/sec")
+        print(f"Max |score_one - score_batch|: {np.abs(single - batch).max():.2e}")
+
+
+if __name__ == '__main__':
+    main()
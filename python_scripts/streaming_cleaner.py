@@ -0,0 +1,360 @@
+"""
+========================================================================
+FRAUD DETECTION - STREAMING DATA CLEANING
+========================================================================
+Purpose: Clean transaction dumps that do not fit in memory
+Method: Fixed-size chunks, global de-duplication via 64-bit row hashes;
+        mergeable summaries (moments, KLL quantile sketch) for the report
+Output: Same rows, in the same order, as data_cleaning.py
+========================================================================
+"""
+
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 250_000
+MAX_MISSING_PER_ROW = 3
+FRAUD_LABELS = {0: 'NO', 1: 'YES'}
+
+# 20M hashes = 160 MB of uint64 before spilling to SQLite
+DEFAULT_MAX_IN_MEMORY_HASHES = 20_000_000
+
+
+class RowHashSet:
+    """Set of 64-bit row hashes used for de-duplication across chunks.
+
+    Hashes live in a sorted NumPy array until ``max_in_memory`` is reached,
+    after which they are moved to an on-disk SQLite table.
+    """
+
+    def __init__(self, max_in_memory=DEFAULT_MAX_IN_MEMORY_HASHES, spill_dir=None):
+        self.max_in_memory = max_in_memory
+        self.spill_dir = spill_dir
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._db = None
+        self._db_path = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def on_disk(self):
+        return self._db is not None
+
+    def add(self, hashes):
+        """Insert ``hashes`` and return a mask of the entries seen for the first time.
+
+        Only the first occurrence of a repeated hash inside ``hashes`` is
+        marked as new, mirroring ``DataFrame.drop_duplicates(keep='first')``.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        uniq, first_idx = np.unique(hashes, return_index=True)
+
+        if self._db is None:
+            new = uniq[~self._contains_in_memory(uniq)]
+            self._hashes = np.insert(self._hashes, np.searchsorted(self._hashes, new), new)
+            if len(self._hashes) > self.max_in_memory:
+                self._spill()
+        else:
+            new = self._insert_on_disk(uniq)
+        self._size += len(new)
+
+        is_new = np.zeros(len(hashes), dtype=bool)
+        is_new[first_idx[np.isin(uniq, new, assume_unique=True)]] = True
+        return is_new
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            os.remove(self._db_path)
+            self._db = None
+
+    def _contains_in_memory(self, uniq):
+        if len(self._hashes) == 0:
+            return np.zeros(len(uniq), dtype=bool)
+        pos = np.searchsorted(self._hashes, uniq)
+        pos[pos == len(self._hashes)] = 0
+        return self._hashes[pos] == uniq
+
+    def _spill(self):
+        fd, self._db_path = tempfile.mkstemp(suffix='.sqlite', dir=self.spill_dir)
+        os.close(fd)
+        self._db = sqlite3.connect(self._db_path)
+        self._db.execute('PRAGMA journal_mode=OFF')
+        self._db.execute('PRAGMA synchronous=OFF')
+        self._db.execute('CREATE TABLE seen (h INTEGER PRIMARY KEY) WITHOUT ROWID')
+        self._db.execute('CREATE TEMP TABLE batch (h INTEGER PRIMARY KEY) WITHOUT ROWID')
+        # SQLite integers are signed 64-bit, so store the hashes reinterpreted as int64
+        self._db.executemany('INSERT INTO seen VALUES (?)',
+                             ((h,) for h in self._hashes.view(np.int64).tolist()))
+        self._db.commit()
+        self._hashes = np.empty(0, dtype=np.uint64)
+
+    def _insert_on_disk(self, uniq):
+        cur = self._db.cursor()
+        cur.execute('DELETE FROM batch')
+        cur.executemany('INSERT INTO batch VALUES (?)', ((h,) for h in uniq.view(np.int64).tolist()))
+        new = [row[0] for row in cur.execute(
+            'SELECT h FROM batch WHERE h NOT IN (SELECT h FROM seen)')]
+        cur.executemany('INSERT INTO seen VALUES (?)', ((h,) for h in new))
+        self._db.commit()
+        return np.sort(np.asarray(new, dtype=np.int64).view(np.uint64))
+
+
+class RunningMoments:
+    """Count, mean, std, min and max merged chunk by chunk (Chan et al.)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        batch = RunningMoments()
+        batch.count = len(values)
+        batch.mean = values.mean()
+        batch.m2 = ((values - batch.mean) ** 2).sum()
+        batch.min = values.min()
+        batch.max = values.max()
+        self.merge(batch)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, state):
+        moments = cls()
+        moments.count = state['count']
+        moments.mean = state['mean']
+        moments.m2 = state['m2']
+        moments.min = state['min']
+        moments.max = state['max']
+        return moments
+
+    def describe(self, sketch=None):
+        """describe()-style summary; with a KLLSketch of the same values, its quartiles too."""
+        summary = {'count': float(self.count), 'mean': self.mean, 'std': self.std, 'min': self.min}
+        if sketch is not None:
+            summary.update({f'{q:.0%}': sketch.quantile(q) for q in (0.25, 0.5, 0.75)})
+        summary['max'] = self.max
+        return pd.Series(summary)
+
+
+class KLLSketch:
+    """Mergeable quantile sketch (Karnin, Lang & Liberty).
+
+    Items at level h stand for 2**h original values; a full level is sorted
+    and every other item is promoted, so the sketch keeps O(k) items no
+    matter how many values it has seen.
+    """
+
+    def __init__(self, k=400, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                leftover = items[len(items) - len(items) % 2:]
+                promoted = items[self._rng.integers(2):len(items) - len(leftover):2]
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantile(self, q):
+        if self.n == 0:
+            return np.nan
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_), 2.0 ** level)
+                                  for level, items_ in enumerate(self.levels)])
+        order = np.argsort(items)
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return items[order][min(position, len(items) - 1)]
+
+    def to_dict(self):
+        # The generator state too, so a reloaded sketch compacts exactly as if it had never been saved
+        return {'k': self.k, 'n': self.n, 'levels': [items.tolist() for items in self.levels],
+                'rng': self._rng.bit_generator.state}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(k=state['k'])
+        sketch.n = state['n']
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in state['levels']]
+        if 'rng' in state:
+            sketch._rng.bit_generator.state = state['rng']
+        return sketch
+
+
+def infer_csv_dtypes(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Resolve the dtypes a single full ``pd.read_csv`` would have inferred.
+
+    Each chunk is parsed independently, so a column that happens to have no
+    nulls in one chunk comes back as int64 there and float64 elsewhere. The
+    hashes and the written text of identical rows must not depend on which
+    chunk they land in, so the per-chunk dtypes are widened once up front.
+    """
+    dtypes = {}
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        for column, dtype in chunk.dtypes.items():
+            seen = dtypes.get(column)
+            if seen is None or seen == dtype:
+                dtypes[column] = dtype
+            elif pd.api.types.is_numeric_dtype(seen) and pd.api.types.is_numeric_dtype(dtype):
+                dtypes[column] = np.result_type(seen, dtype)
+            else:
+                dtypes[column] = np.dtype(object)
+    return dtypes
+
+
+def csv_writer(output_path):
+    """Chunk writer appending to a single CSV file (header on the first chunk)."""
+    def write(cleaned, chunk_index):
+        cleaned.to_csv(output_path, index=False, mode='w' if chunk_index == 0 else 'a',
+                       header=chunk_index == 0)
+    return write
+
+
+def clean_chunk(chunk, seen):
+    """Apply the data_cleaning.py rules to one chunk.
+
+    Returns the cleaned chunk and the number of duplicate rows removed.
+    """
+    chunk['fraud'] = chunk['fraud'].replace(FRAUD_LABELS).astype(object)
+    is_new = seen.add(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+    deduped = chunk[is_new]
+    return deduped, int((~is_new).sum())
+
+
+def stream_clean(input_path, output_path, chunksize=DEFAULT_CHUNKSIZE, dtypes=None,
+                 max_in_memory_hashes=DEFAULT_MAX_IN_MEMORY_HASHES, writer=None):
+    """Clean ``input_path`` chunk by chunk and write the result incrementally.
+
+    ``dtypes`` skips the schema pass when the column types are already known.
+    ``writer`` is called as ``writer(cleaned_chunk, chunk_index)``; by default
+    the chunks are appended to the CSV at ``output_path``.
+    """
+    if dtypes is None:
+        dtypes = infer_csv_dtypes(input_path, chunksize)
+
+    if writer is None:
+        writer = csv_writer(output_path)
+
+    seen = RowHashSet(max_in_memory=max_in_memory_hashes,
+                      spill_dir=os.path.dirname(os.path.abspath(output_path)))
+    time_stats = RunningMoments()
+    time_sketch = KLLSketch(seed=0)
+    null_counts = None
+    duplicates = 0
+    rows_out = 0
+    n_columns = len(dtypes)
+    negative_amount_rows = []
+    negative_sampled = 0
+    negative_amounts = 0
+    negative_devices = 0
+    head = None
+
+    try:
+        reader = pd.read_csv(input_path, chunksize=chunksize, dtype=dtypes)
+        for chunk_index, chunk in enumerate(reader):
+            deduped, n_dup = clean_chunk(chunk, seen)
+            duplicates += n_dup
+
+            chunk_nulls = deduped.isnull().sum()
+            null_counts = chunk_nulls if null_counts is None else null_counts + chunk_nulls
+
+            cleaned = deduped.dropna(thresh=n_columns - MAX_MISSING_PER_ROW)
+
+            negative = cleaned[cleaned['amount'] < 0]
+            negative_amounts += len(negative)
+            # Keep the first 5 negative rows overall, however the chunks split them
+            if negative_sampled < 5 and len(negative):
+                part = negative.head(5 - negative_sampled)
+                negative_amount_rows.append(part)
+                negative_sampled += len(part)
+            negative_devices += int((cleaned['device_id'] < 0).sum())
+
+            time_stats.update(cleaned['time'])
+            time_sketch.update(cleaned['time'])
+            if head is None or len(head) < 5:
+                head = cleaned.head(5) if head is None else pd.concat([head, cleaned]).head(5)
+
+            writer(cleaned, chunk_index)
+            rows_out += len(cleaned)
+    finally:
+        seen.close()
+
+    print(f"Duplicates before cleaning: {duplicates}")
+    print(f"Duplicates after cleaning: 0")
+    print(f"\nNull values by column:\n{null_counts}")
+
+    if negative_amounts > 0:
+        print(f"\nWarning: Found {negative_amounts} rows with negative amounts")
+        print(pd.concat(negative_amount_rows))
+    if negative_devices > 0:
+        print(f"\nWarning: Found {negative_devices} rows with negative device IDs")
+
+    print(f"\nCleaned dataset shape: ({rows_out}, {n_columns})")
+    print(f"\nFirst few rows:")
+    print(head)
+    print(f"\nTime column statistics (streaming, quartiles from a KLL sketch):")
+    print(time_stats.describe(time_sketch).rename('time'))
+
+    return {'rows_out': rows_out, 'duplicates': duplicates,
+            'negative_amounts': negative_amounts, 'negative_devices': negative_devices}
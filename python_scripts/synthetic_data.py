@@ -0,0 +1,152 @@
+"""
+========================================================================
+FRAUD DETECTION - SYNTHETIC MESSY TRANSACTION GENERATOR
+========================================================================
+Purpose: Deterministic stand-in for messy_synthetic_fraud.csv at any size
+         (10k to 100M rows), for development and scaling benchmarks
+Schema: user_id, amount, payment_method, category, device_id, time, fraud
+Mess: exact duplicate rows, per-cell nulls, -5.0 sentinel amounts
+Skew: Zipf-like user/device popularity; users mostly reuse a home device
+Output: CSV written chunk by chunk (bounded memory)
+========================================================================
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['user_id', 'amount', 'payment_method', 'category', 'device_id', 'time', 'fraud']
+PAYMENT_METHODS = ['bank_transfer', 'credit_card', 'debit_card', 'paypal']
+CATEGORIES = ['clothing', 'electronics', 'grocery', 'travel']
+
+# Relative fraud risk per level; normalized so the overall rate is fraud_rate
+PAYMENT_RISK = np.array([1.3, 1.0, 0.9, 0.8])
+CATEGORY_RISK = np.array([0.8, 1.5, 0.7, 1.0])
+NIGHT_RISK = 1.6  # 00:00-05:59
+FRAUD_AMOUNT_FACTOR = 2.5
+NEGATIVE_SENTINEL = -5.0
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def _popularity_cdf(n, skew):
+    """CDF of a Zipf-like law over ``n`` ranks (skew=0 is uniform)."""
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+class SyntheticFraudGenerator:
+    """Chunked generator; the same arguments always produce the same rows."""
+
+    def __init__(self, rows, fraud_rate=0.10, duplicate_rate=0.02, null_rate=0.02,
+                 negative_rate=0.01, users=None, devices=None, user_skew=1.0,
+                 device_skew=0.8, home_device_rate=0.7, days=14, seed=42,
+                 chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.rows = rows
+        self.fraud_rate = fraud_rate
+        self.duplicate_rate = duplicate_rate
+        self.null_rate = null_rate
+        self.negative_rate = negative_rate
+        self.users = users or max(rows // 10, 100)
+        self.devices = devices or max(rows * 3 // 20, 100)
+        self.home_device_rate = home_device_rate
+        self.days = days
+        self.seed = seed
+        self.chunk_rows = chunk_rows
+
+        setup = np.random.default_rng([seed, 0])
+        # Popularity rank -> id, so the heavy users are not simply ids 1..k
+        self.user_ids = setup.permutation(self.users) + 1
+        self.device_ids = setup.permutation(self.devices) + 1
+        self.home_device = setup.integers(1, self.devices + 1, self.users + 1)
+        self.user_cdf = _popularity_cdf(self.users, user_skew)
+        self.device_cdf = _popularity_cdf(self.devices, device_skew)
+
+        night_share = 6 / 24
+        self.mean_risk = (PAYMENT_RISK.mean() * CATEGORY_RISK.mean()
+                          * (night_share * NIGHT_RISK + (1 - night_share)))
+
+    def chunks(self):
+        """Yield DataFrames of at most ``chunk_rows`` messy rows, in file order."""
+        n_chunks = -(-self.rows // self.chunk_rows)
+        for index, chunk_seed in enumerate(np.random.SeedSequence([self.seed, 1]).spawn(n_chunks)):
+            n = min(self.chunk_rows, self.rows - index * self.chunk_rows)
+            yield self._chunk(np.random.default_rng(chunk_seed), n)
+
+    def _chunk(self, rng, n):
+        n_duplicates = int(round(n * self.duplicate_rate))
+        n_unique = n - n_duplicates
+
+        users = self.user_ids[np.searchsorted(self.user_cdf, rng.random(n_unique))]
+        roaming = self.device_ids[np.searchsorted(self.device_cdf, rng.random(n_unique))]
+        devices = np.where(rng.random(n_unique) < self.home_device_rate, self.home_device[users], roaming)
+        payment = rng.integers(0, len(PAYMENT_METHODS), n_unique)
+        category = rng.integers(0, len(CATEGORIES), n_unique)
+        times = np.floor(rng.random(n_unique) * self.days * 86400)
+
+        night = (times // 3600) % 24 < 6
+        risk = PAYMENT_RISK[payment] * CATEGORY_RISK[category] * np.where(night, NIGHT_RISK, 1.0)
+        fraud = rng.random(n_unique) < np.minimum(self.fraud_rate * risk / self.mean_risk, 1.0)
+
+        amounts = rng.lognormal(3.9, 1.0, n_unique) * np.where(fraud, FRAUD_AMOUNT_FACTOR, 1.0)
+
+        chunk = pd.DataFrame({
+            'user_id': users.astype(np.float64),
+            'amount': np.round(amounts, 2),
+            'payment_method': np.asarray(PAYMENT_METHODS, dtype=object)[payment],
+            'category': np.asarray(CATEGORIES, dtype=object)[category],
+            'device_id': devices.astype(np.float64),
+            'time': times,
+            'fraud': fraud.astype(np.float64),
+        })
+        chunk.loc[rng.random(n_unique) < self.negative_rate, 'amount'] = NEGATIVE_SENTINEL
+
+        # Nulls are injected before duplication so copies are exact duplicates
+        for column in COLUMNS:
+            chunk.loc[rng.random(n_unique) < self.null_rate, column] = np.nan
+
+        if n_duplicates:
+            copies = chunk.iloc[rng.integers(0, n_unique, n_duplicates)]
+            chunk = pd.concat([chunk, copies], ignore_index=True)
+            chunk = chunk.iloc[rng.permutation(n)].reset_index(drop=True)
+        return chunk
+
+    def write_csv(self, path):
+        """Write all rows to ``path``; returns the number of rows written."""
+        written = 0
+        for index, chunk in enumerate(self.chunks()):
+            chunk.to_csv(path, index=False, mode='w' if index == 0 else 'a', header=index == 0)
+            written += len(chunk)
+        return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a messy synthetic fraud dataset")
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--output', default='messy_synthetic_fraud.csv')
+    parser.add_argument('--fraud-rate', type=float, default=0.10)
+    parser.add_argument('--duplicate-rate', type=float, default=0.02)
+    parser.add_argument('--null-rate', type=float, default=0.02, help="Per-cell probability")
+    parser.add_argument('--negative-rate', type=float, default=0.01,
+                        help="Share of -5.0 sentinel amounts")
+    parser.add_argument('--users', type=int, default=None, help="Default: rows / 10")
+    parser.add_argument('--devices', type=int, default=None, help="Default: rows * 0.15")
+    parser.add_argument('--user-skew', type=float, default=1.0, help="Zipf exponent (0 = uniform)")
+    parser.add_argument('--device-skew', type=float, default=0.8, help="Zipf exponent (0 = uniform)")
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    generator = SyntheticFraudGenerator(
+        args.rows, fraud_rate=args.fraud_rate, duplicate_rate=args.duplicate_rate,
+        null_rate=args.null_rate, negative_rate=args.negative_rate, users=args.users,
+        devices=args.devices, user_skew=args.user_skew, device_skew=args.device_skew,
+        days=args.days, seed=args.seed, chunk_rows=args.chunk_rows)
+
+    start = time.perf_counter()
+    written = generator.write_csv(args.output)
+    print(f"{written:,} rows saved as '{args.output}' in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,263 @@
+"""
+========================================================================
+FRAUD DETECTION - CACHED TASK GRAPH
+========================================================================
+Purpose: Run report sections as a dependency graph on a thread pool and
+         skip the ones whose inputs and code have not changed
+Cache key: data fingerprint + task name + version + hash of the task's
+           source, the same-module helpers it calls and every project
+           module it imports (directly or through other project modules)
+           + the keys of its dependencies, so editing one task or a helper
+           recomputes only what uses it and everything downstream
+Output: Each task's printed text (captured per thread, replayed in
+        declaration order) and its structured results
+========================================================================
+"""
+
+import ast
+import hashlib
+import inspect
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+DEFAULT_CACHE_DIR = '.eda_cache'
+
+
+@dataclass
+class Task:
+    """``func(data, deps)`` returns a dict of results; ``deps`` maps each dependency to its results."""
+    name: str
+    func: object
+    deps: tuple = ()
+    version: int = 1
+
+
+@dataclass
+class TaskResult:
+    text: str
+    results: dict
+    key: str
+    cached: bool = False
+    seconds: float = 0.0
+
+
+def _source(func):
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return func.__qualname__
+
+
+def _code_names(code):
+    """Global, attribute and imported names used by ``code`` and the functions nested in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+
+def _imported_files(path, directory):
+    """Files in ``directory`` that the module at ``path`` imports, lazily or not."""
+    with open(path) as fh:
+        tree = ast.parse(fh.read())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    paths = {os.path.join(directory, f'{name}.py') for name in names}
+    return {path for path in paths if os.path.exists(path)}
+
+
+def task_sources(func):
+    """(helpers, files) the task's results depend on besides its own source.
+
+    ``helpers`` are the functions of the task's module it calls, followed
+    recursively; ``files`` are the project modules (the .py files beside
+    the task's module) those use by name or by a lazy import, plus every
+    project module they import in turn. The task's own module file is left
+    out so editing one section does not invalidate the others; module-level
+    constants there are not tracked, bump the task's version instead.
+    """
+    home = inspect.getmodule(func)
+    home_path = os.path.abspath(getattr(home, '__file__', None) or '')
+    if not os.path.isfile(home_path):
+        return [], []
+    directory = os.path.dirname(home_path)
+
+    helpers, files, stack = [], set(), [func]
+    while stack:
+        current = stack.pop()
+        for name in _code_names(current.__code__):
+            value = current.__globals__.get(name)
+            if inspect.isfunction(value) and inspect.getmodule(value) is home:
+                if value is not func and value not in helpers:
+                    helpers.append(value)
+                    stack.append(value)
+                continue
+            if value is None:
+                path = os.path.join(directory, f'{name}.py')  # a lazy import (or not a global at all)
+            else:
+                module = value if inspect.ismodule(value) else inspect.getmodule(value)
+                path = getattr(module, '__file__', None)
+            if path and os.path.dirname(os.path.abspath(path)) == directory and os.path.exists(path):
+                files.add(os.path.abspath(path))
+
+    pending = list(files)
+    while pending:
+        for path in _imported_files(pending.pop(), directory) - files:
+            files.add(path)
+            pending.append(path)
+    files.discard(home_path)
+    return sorted(helpers, key=lambda helper: helper.__qualname__), sorted(files)
+
+
+def task_key(task, fingerprint, dep_keys):
+    digest = hashlib.sha256()
+    helpers, files = task_sources(task.func)
+    sources = [_source(task.func), *(_source(helper) for helper in helpers)]
+    for path in files:
+        with open(path, 'rb') as fh:
+            sources.append(f'{os.path.basename(path)}:{hashlib.sha256(fh.read()).hexdigest()}')
+    for part in [fingerprint, task.name, str(task.version), *sources, *dep_keys]:
+        digest.update(part.encode())
+        digest.update(b'\0')
+    return digest.hexdigest()[:32]
+
+
+class ResultCache:
+    """One joblib file per task result, named ``<task>-<key>.joblib``."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, name, key):
+        safe = ''.join(ch if ch.isalnum() else '_' for ch in name)
+        return os.path.join(self.directory, f'{safe}-{key}.joblib')
+
+    def get(self, name, key):
+        path = self._path(name, key)
+        if not os.path.exists(path):
+            return None
+        import joblib
+
+        try:
+            return joblib.load(path)
+        except Exception:  # a partial or stale file is just a miss
+            return None
+
+    def put(self, name, key, value):
+        import joblib
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name, key)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        joblib.dump(value, tmp_path)
+        os.replace(tmp_path, path)
+
+
+class _ThreadStdout(io.TextIOBase):
+    """sys.stdout stand-in that sends each thread's prints to its own buffer, if it has one."""
+
+    def __init__(self, target):
+        self.target = target
+        self._local = threading.local()
+
+    def capture(self):
+        self._local.buffer = io.StringIO()
+        return self._local.buffer
+
+    def release(self):
+        buffer, self._local.buffer = self._local.buffer, None
+        return buffer.getvalue()
+
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer or self.target).write(text)
+
+    def flush(self):
+        self.target.flush()
+
+
+def _check_graph(tasks):
+    names = [task.name for task in tasks]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate task names in {names}")
+    seen = set()
+    for task in tasks:
+        missing = [dep for dep in task.deps if dep not in seen]
+        if missing:
+            raise ValueError(f"Task '{task.name}' depends on {missing}, which must be declared before it")
+        seen.add(task.name)
+
+
+def run_tasks(tasks, data, fingerprint, cache=None, n_jobs=None, on_done=None):
+    """Run ``tasks`` (declared in dependency order) and return {name: TaskResult}.
+
+    Up to ``n_jobs`` tasks whose dependencies are done run at once on
+    threads; cached tasks are loaded instead of run. ``on_done(name,
+    result)`` is called in declaration order as soon as a task and all
+    tasks before it are done, so text can be streamed while later tasks
+    still run.
+    """
+    _check_graph(tasks)
+    keys = {}
+    for task in tasks:
+        keys[task.name] = task_key(task, fingerprint, [keys[dep] for dep in task.deps])
+
+    stdout = sys.stdout if isinstance(sys.stdout, _ThreadStdout) else _ThreadStdout(sys.stdout)
+
+    def compute(task, deps):
+        stdout.capture()
+        start = time.perf_counter()
+        try:
+            results = task.func(data, deps)
+        finally:
+            text = stdout.release()
+        return TaskResult(text, results or {}, keys[task.name], seconds=time.perf_counter() - start)
+
+    done = {}
+    emitted = 0
+
+    def finish(name, result):
+        nonlocal emitted
+        done[name] = result
+        while emitted < len(tasks) and tasks[emitted].name in done:
+            if on_done is not None:
+                on_done(tasks[emitted].name, done[tasks[emitted].name])
+            emitted += 1
+
+    pending = list(tasks)
+    running = {}
+    previous_stdout, sys.stdout = sys.stdout, stdout
+    try:
+        with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count() or 1) as pool:
+            while pending or running:
+                for task in [task for task in pending if all(dep in done for dep in task.deps)]:
+                    pending.remove(task)
+                    cached = cache.get(task.name, keys[task.name]) if cache is not None else None
+                    if cached is not None:
+                        finish(task.name, TaskResult(cached['text'], cached['results'], keys[task.name],
+                                                     cached=True))
+                        continue
+                    deps = {dep: done[dep].results for dep in task.deps}
+                    running[pool.submit(compute, task, deps)] = task.name
+                if not running:
+                    continue
+                completed, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    name = running.pop(future)
+                    result = future.result()
+                    if cache is not None:
+                        cache.put(name, result.key, {'text': result.text, 'results': result.results})
+                    finish(name, result)
+    finally:
+        sys.stdout = previous_stdout
+    return {task.name: done[task.name] for task in tasks}
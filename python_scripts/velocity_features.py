@@ -0,0 +1,331 @@
+"""
+========================================================================
+FRAUD DETECTION - VELOCITY / BEHAVIORAL FEATURES
+========================================================================
+Purpose: Per-user and per-device rolling-window features over ``time``
+Offline: velocity_features() - sort once, then searchsorted + prefix sums
+Online: VelocityState - compact per-key sliding buffers, one update per
+        transaction, same values as the offline pass; keys idle for longer
+        than the widest window (or HISTORY_TTL) are evicted, so memory
+        follows the active keys, not every key ever seen
+Features: only transactions *before* the current one are counted (no
+          label or future leakage); distinct counts include the current one.
+          The amount z-score and distinct counts cover a key's history
+          since it was last idle for more than HISTORY_TTL
+Imports: pandas is only loaded by the frame-based functions, so the online
+         state stays cheap to import for real-time scoring
+========================================================================
+"""
+
+import argparse
+import math
+
+import numpy as np
+
+WINDOWS = {'1h': 3600, '24h': 86400}
+AMOUNT_WINDOW = '24h'
+# A key idle for longer than this starts a fresh history (z-score, distinct
+# counts); it bounds the online state without changing the window counts
+HISTORY_TTL = 30 * 86400
+
+VELOCITY_COLUMNS = (
+    [f'user_txn_{name}' for name in WINDOWS]
+    + [f'device_txn_{name}' for name in WINDOWS]
+    + [f'user_amount_{AMOUNT_WINDOW}', 'user_amount_z',
+       'user_distinct_devices', 'device_distinct_users']
+)
+
+
+# ======================== OFFLINE (VECTORIZED) ========================
+
+def _time_ranks(times):
+    """Dense rank of every time and, per window, the rank count of times <= t - width.
+
+    Both are found in one pass over the time-sorted rows, where the lookups are
+    monotone; ranks turn the (key, time) order into exact int64 comparisons.
+    """
+    valid = np.flatnonzero(~np.isnan(times))
+    order = valid[np.argsort(times[valid], kind='stable')]
+    sorted_times = times[order]
+    is_new = np.r_[True, sorted_times[1:] != sorted_times[:-1]] if len(order) else np.zeros(0, dtype=bool)
+    uniq = sorted_times[is_new]
+
+    ranks = np.full(len(times), -1, dtype=np.int64)
+    ranks[order] = np.cumsum(is_new) - 1
+    lower = {}
+    for name, width in WINDOWS.items():
+        lower[name] = np.full(len(times), -1, dtype=np.int64)
+        lower[name][order] = np.searchsorted(uniq, sorted_times - width, side='right')
+    return ranks, lower, len(uniq) + 1
+
+
+def _key_pass(keys, others, ranks, lower_ranks, stride, times, amounts=None, history_ttl=HISTORY_TTL):
+    """Window counts, distinct ``others`` and (optionally) amount features per key.
+
+    Rows are processed in (key, time, original position) order, which is the
+    order a time-ordered stream sees them within each key. A gap of more than
+    ``history_ttl`` between a key's rows starts a new history segment, as
+    VelocityState's eviction does. Returns arrays aligned to the input rows;
+    rows with a missing key or time are NaN.
+    """
+    n = len(keys)
+    out = {}
+    rows = np.flatnonzero((keys >= 0) & (ranks >= 0))
+    order = rows[np.lexsort((rows, ranks[rows], keys[rows]))]
+    k = keys[order]
+    pos = np.arange(len(order))
+    is_start = np.r_[True, k[1:] != k[:-1]] if len(order) else np.zeros(0, dtype=bool)
+    # History segments: a key's rows, split where it was idle for longer than history_ttl
+    t = times[order]
+    is_start |= np.r_[False, t[1:] - t[:-1] > history_ttl] if len(order) else is_start
+    segment = np.cumsum(is_start) - 1
+    start = np.maximum.accumulate(np.where(is_start, pos, 0)) if len(order) else pos
+    composite = k * stride + ranks[order]
+
+    def scatter(values):
+        full = np.full(n, np.nan)
+        full[order] = values
+        return full
+
+    for name in WINDOWS:
+        # First position of the same key whose time is > t - width
+        lower = np.searchsorted(composite, k * stride + lower_ranks[name][order], side='left')
+        out[f'txn_{name}'] = scatter(pos - lower)
+        if amounts is not None and name == AMOUNT_WINDOW:
+            prefix = np.r_[0.0, np.cumsum(np.nan_to_num(amounts[order]))]
+            out[f'amount_{name}'] = scatter(prefix[pos] - prefix[lower])
+
+    if amounts is not None:
+        import pandas as pd
+
+        # z-score of the amount against all *earlier* amounts in the key's segment
+        # (0 while there is no spread to compare against).
+        # Shifting by the segment's first amount keeps the prefix sums small, so
+        # repeated identical amounts give an exact zero variance.
+        a = amounts[order]
+        has = ~np.isnan(a)
+        first_amount = pd.Series(np.where(has, a, np.nan)).groupby(segment).transform('first').to_numpy()
+        shifted = np.where(has, a - np.nan_to_num(first_amount), 0.0)
+        count = np.r_[0, np.cumsum(has)]
+        total = np.r_[0.0, np.cumsum(shifted)]
+        squares = np.r_[0.0, np.cumsum(shifted ** 2)]
+        m = count[pos] - count[start]
+        s = total[pos] - total[start]
+        q = squares[pos] - squares[start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = s / m
+            std = np.sqrt(np.maximum(q - s * mean, 0.0) / (m - 1))
+            z = np.where((m >= 2) & (std > 0), (shifted - mean) / std, 0.0)
+        out['amount_z'] = scatter(np.where(has, z, np.nan))
+
+    # Distinct partners seen so far in the segment (current row included)
+    o = others[order]
+    seen = o >= 0
+    pair = np.where(seen, segment * (others.max(initial=0) + 1) + o, -1)
+    first = np.zeros(len(order), dtype=np.int64)
+    _, first_pos = np.unique(pair, return_index=True)
+    first[first_pos] = 1
+    first[~seen] = 0
+    distinct = np.r_[0, np.cumsum(first)]
+    out['distinct'] = scatter(distinct[pos + 1] - distinct[start])
+    return out
+
+
+def velocity_features(df, user='user_id', device='device_id', time='time', amount='amount',
+                      history_ttl=HISTORY_TTL):
+    """All VELOCITY_COLUMNS for ``df`` (any row order), aligned to ``df.index``."""
+    import pandas as pd
+
+    times = df[time].to_numpy(dtype=np.float64, na_value=np.nan)
+    amounts = df[amount].to_numpy(dtype=np.float64, na_value=np.nan)
+    users = pd.factorize(df[user])[0]
+    devices = pd.factorize(df[device])[0]
+
+    ranks, lower_ranks, stride = _time_ranks(times)
+    by_user = _key_pass(users, devices, ranks, lower_ranks, stride, times, amounts, history_ttl)
+    by_device = _key_pass(devices, users, ranks, lower_ranks, stride, times, history_ttl=history_ttl)
+
+    features = {}
+    for name in WINDOWS:
+        features[f'user_txn_{name}'] = by_user[f'txn_{name}']
+    for name in WINDOWS:
+        features[f'device_txn_{name}'] = by_device[f'txn_{name}']
+    features[f'user_amount_{AMOUNT_WINDOW}'] = by_user[f'amount_{AMOUNT_WINDOW}']
+    features['user_amount_z'] = by_user['amount_z']
+    features['user_distinct_devices'] = by_user['distinct']
+    features['device_distinct_users'] = by_device['distinct']
+    return pd.DataFrame(features, index=df.index)[VELOCITY_COLUMNS]
+
+
+# ======================== ONLINE (STREAMING) ========================
+
+class _KeyWindow:
+    """One key's recent (time, amount) events in two Python lists, oldest first.
+
+    ``starts[j]`` is the first live entry for window j; entries older than the
+    widest window are dropped in bulk once they make up half of the lists.
+    """
+
+    __slots__ = ('times', 'amounts', 'starts', 'amount_sum')
+
+    def __init__(self, n_windows):
+        self.times = []
+        self.amounts = []
+        self.starts = [0] * n_windows
+        self.amount_sum = 0.0
+
+    def counts(self, t, widths, amount_index):
+        times = self.times
+        end = len(times)
+        counts = []
+        for j, width in enumerate(widths):
+            s = self.starts[j]
+            while s < end and times[s] <= t - width:
+                if j == amount_index:
+                    a = self.amounts[s]
+                    if a == a:
+                        self.amount_sum -= a
+                s += 1
+            self.starts[j] = s
+            counts.append(end - s)
+        if self.starts[amount_index] == end:
+            self.amount_sum = 0.0  # drop accumulated rounding once the window is empty
+        return counts
+
+    def push(self, t, amount, amount_index):
+        self.times.append(t)
+        self.amounts.append(amount)
+        if amount == amount:
+            self.amount_sum += amount
+        oldest = min(self.starts)
+        if oldest > 64 and oldest * 2 > len(self.times):
+            del self.times[:oldest], self.amounts[:oldest]
+            self.starts = [s - oldest for s in self.starts]
+
+
+class VelocityState:
+    """Streaming state for VELOCITY_COLUMNS; feed transactions in time order.
+
+    ``update()`` returns the features of a transaction from the state before
+    it and then folds it in, so scoring and training see identical values.
+    Once per widest window of stream time, windows whose newest event has
+    left every window are dropped (exact: they would count 0) and so are
+    histories idle for more than ``history_ttl`` (a returning key would
+    restart them anyway, in both the online and the offline pass).
+    """
+
+    def __init__(self, history_ttl=HISTORY_TTL):
+        self.widths = list(WINDOWS.values())
+        self.amount_index = list(WINDOWS).index(AMOUNT_WINDOW)
+        self.max_width = max(self.widths)
+        self.history_ttl = history_ttl
+        self.user_windows = {}
+        self.device_windows = {}
+        self.user_history = {}  # user -> [last_seen, count, mean, m2, devices] of its current history
+        self.device_history = {}  # device -> [last_seen, users]
+        self.last_evicted = -math.inf
+
+    def __len__(self):
+        return len(self.user_history) + len(self.device_history)
+
+    def _window(self, table, key):
+        window = table.get(key)
+        if window is None:
+            window = table[key] = _KeyWindow(len(self.widths))
+        return window
+
+    def _history(self, table, key, t, empty):
+        history = table.get(key)
+        if history is None or t - history[0] > self.history_ttl:
+            history = table[key] = [t, *empty()]
+        history[0] = t
+        return history
+
+    def evict(self, now):
+        """Drop the windows and histories of keys idle at time ``now``; returns how many."""
+        horizon = now - self.max_width
+        history_horizon = now - self.history_ttl
+        evicted = 0
+        for table, is_idle in [(self.user_windows, lambda window: window.times[-1] <= horizon),
+                               (self.device_windows, lambda window: window.times[-1] <= horizon),
+                               (self.user_history, lambda history: history[0] < history_horizon),
+                               (self.device_history, lambda history: history[0] < history_horizon)]:
+            idle = [key for key, value in table.items() if is_idle(value)]
+            for key in idle:
+                del table[key]
+            evicted += len(idle)
+        self.last_evicted = now
+        return evicted
+
+    def update(self, user, device, t, amount):
+        nan = math.nan
+        user = None if user is None or user != user else user
+        device = None if device is None or device != device else device
+        amount = nan if amount is None else float(amount)
+        features = dict.fromkeys(VELOCITY_COLUMNS, nan)
+        if t is None or t != t:
+            return features
+        t = float(t)
+        if t - self.last_evicted >= self.max_width:
+            self.evict(t)
+
+        if user is not None:
+            window = self._window(self.user_windows, user)
+            for name, count in zip(WINDOWS, window.counts(t, self.widths, self.amount_index)):
+                features[f'user_txn_{name}'] = float(count)
+            features[f'user_amount_{AMOUNT_WINDOW}'] = window.amount_sum
+            window.push(t, amount, self.amount_index)
+
+            user_history = self._history(self.user_history, user, t, lambda: (0, 0.0, 0.0, set()))
+            if amount == amount:
+                count, mean, m2 = user_history[1:4]
+                std = math.sqrt(m2 / (count - 1)) if count >= 2 else 0.0
+                features['user_amount_z'] = (amount - mean) / std if std > 0 else 0.0
+                count += 1
+                delta = amount - mean
+                mean += delta / count
+                m2 += delta * (amount - mean)
+                user_history[1:4] = [count, mean, m2]
+
+        if device is not None:
+            window = self._window(self.device_windows, device)
+            for name, count in zip(WINDOWS, window.counts(t, self.widths, self.amount_index)):
+                features[f'device_txn_{name}'] = float(count)
+            window.push(t, amount, self.amount_index)
+            device_history = self._history(self.device_history, device, t, lambda: (set(),))
+
+        if user is not None and device is not None:
+            user_history[4].add(device)
+            device_history[1].add(user)
+        if user is not None:
+            features['user_distinct_devices'] = float(len(user_history[4]))
+        if device is not None:
+            features['device_distinct_users'] = float(len(device_history[1]))
+        return features
+
+    def process(self, df, user='user_id', device='device_id', time='time', amount='amount'):
+        """Stream a whole frame through the state in time order (stable on ties)."""
+        import pandas as pd
+
+        ordered = df[[user, device, time, amount]].astype(object)
+        ordered = ordered.where(ordered.notna(), None)
+        order = np.argsort(df[time].to_numpy(dtype=np.float64, na_value=np.nan), kind='stable')
+        rows = ordered.to_numpy()
+        features = [None] * len(df)
+        for i in order:
+            features[i] = self.update(*rows[i])
+        return pd.DataFrame(features, index=df.index, columns=VELOCITY_COLUMNS)
+
+
+if __name__ == '__main__':
+    from columnar_store import load_cleaned
+
+    parser = argparse.ArgumentParser(description="Compute velocity features for the cleaned data")
+    parser.add_argument('--data', default='cleaned_fraud_data.csv')
+    parser.add_argument('--output', default='velocity_features.csv')
+    args = parser.parse_args()
+
+    df = load_cleaned(args.data, columns=['user_id', 'device_id', 'amount', 'time'])
+    features = velocity_features(df)
+    features.round(4).to_csv(args.output, index=False)
+    print(f"{len(VELOCITY_COLUMNS)} velocity features for {len(features):,} rows saved as '{args.output}'")
@@ -0,0 +1,187 @@
+/*=============================================================================
+  FRAUD DETECTION EDA - ROLLUP CUBE VERSION
+  Purpose: Same 12 reports as fraud_eda.sql, answered from the pre-aggregated
+           cube instead of scanning credit.cleaned_fraud on every refresh
+  Cube: credit.fraud_cube, one row per (day, hour, payment_method, category,
+        fraud) with txn_count, amount_count, amount_sum, amount_min, amount_max
+  Build: python python_scripts/rollup_cube.py build --with-raw
+  Run:   python python_scripts/rollup_cube.py query --sql sql_queries/fraud_eda_cube.sql
+  Notes: AVG(amount) becomes SUM(amount_sum) / SUM(amount_count).
+         Queries 8 and 11 are finer than the cube grain (user / device) and
+         still read the raw table.
+=============================================================================*/
+
+-- ============================================================================
+-- QUERY 1: FRAUD OVERVIEW - Transaction Volume Analysis
+-- ============================================================================
+
+SELECT
+    SUM(CASE WHEN fraud = 'YES' THEN txn_count ELSE 0 END) AS total_fraud_cases,
+    SUM(CASE WHEN fraud = 'NO' THEN txn_count ELSE 0 END) AS total_legitimate_transactions,
+    ROUND(100.0 * SUM(CASE WHEN fraud = 'YES' THEN txn_count ELSE 0 END) / SUM(txn_count), 2) AS fraud_rate_percent,
+    SUM(txn_count) AS total_transactions
+FROM credit.fraud_cube;
+
+-- ============================================================================
+-- QUERY 2: PAYMENT METHOD RISK ANALYSIS - Average Transaction Amount
+-- ============================================================================
+
+SELECT
+    payment_method,
+    ROUND(SUM(amount_sum) / SUM(amount_count), 2) AS avg_transaction_amount,
+    SUM(txn_count) AS transaction_count,
+    ROUND(SUM(CASE WHEN fraud = 'YES' THEN amount_sum END)
+          / SUM(CASE WHEN fraud = 'YES' THEN amount_count END), 2) AS avg_fraud_amount
+FROM credit.fraud_cube
+GROUP BY payment_method
+ORDER BY avg_transaction_amount DESC;
+
+-- ============================================================================
+-- QUERY 3: FRAUD SEVERITY ANALYSIS - Transaction Amount Comparison
+-- ============================================================================
+
+SELECT
+    fraud,
+    SUM(txn_count) AS transaction_count,
+    ROUND(SUM(amount_sum) / SUM(amount_count), 2) AS avg_amount,
+    ROUND(MIN(amount_min), 2) AS min_amount,
+    ROUND(MAX(amount_max), 2) AS max_amount,
+    ROUND(SUM(amount_sum), 2) AS total_amount
+FROM credit.fraud_cube
+GROUP BY fraud;
+
+-- ============================================================================
+-- QUERY 4: PAYMENT METHOD DISTRIBUTION - Fraud by Payment Type
+-- ============================================================================
+
+SELECT
+    payment_method,
+    SUM(CASE WHEN fraud = 'YES' THEN txn_count ELSE 0 END) AS fraud_count,
+    SUM(CASE WHEN fraud = 'NO' THEN txn_count ELSE 0 END) AS legitimate_count,
+    ROUND(100.0 * SUM(CASE WHEN fraud = 'YES' THEN txn_count ELSE 0 END) / SUM(txn_count), 2) AS fraud_rate_percent,
+    SUM(txn_count) AS total_transactions
+FROM credit.fraud_cube
+GROUP BY payment_method
+ORDER BY fraud_rate_percent DESC;
+
+-- ============================================================================
+-- QUERY 5: HIGH-RISK PAYMENT METHODS - Prioritize Fraud Prevention
+-- ============================================================================
+
+SELECT
+    payment_method,
+    SUM(txn_count) AS fraud_incidents,
+    ROUND(SUM(amount_sum), 2) AS total_fraud_amount,
+    ROUND(SUM(amount_sum) / SUM(amount_count), 2) AS avg_fraud_amount
+FROM credit.fraud_cube
+WHERE fraud = 'YES'
+GROUP BY payment_method
+ORDER BY fraud_incidents DESC;
+
+-- ============================================================================
+-- QUERY 6: LOW-RISK PAYMENT METHODS - Secure Channels Assessment
+-- ============================================================================
+
+SELECT
+    payment_method,
+    SUM(txn_count) AS legitimate_transactions,
+    ROUND(SUM(amount_sum), 2) AS total_legitimate_amount,
+    ROUND(SUM(amount_sum) / SUM(amount_count), 2) AS avg_legitimate_amount
+FROM credit.fraud_cube
+WHERE fraud = 'NO'
+GROUP BY payment_method
+ORDER BY legitimate_transactions DESC;
+
+-- ============================================================================
+-- QUERY 7: PRODUCT CATEGORY FRAUD RISK - What's Being Targeted?
+-- ============================================================================
+
+SELECT
+    category,
+    SUM(CASE WHEN fraud = 'YES' THEN txn_count ELSE 0 END) AS fraud_incidents,
+    SUM(txn_count) AS total_transactions,
+    ROUND(100.0 * SUM(CASE WHEN fraud = 'YES' THEN txn_count ELSE 0 END) / SUM(txn_count), 2) AS fraud_rate_percent,
+    ROUND(SUM(CASE WHEN fraud = 'YES' THEN amount_sum ELSE 0 END), 2) AS fraud_amount_lost
+FROM credit.fraud_cube
+GROUP BY category
+ORDER BY fraud_incidents DESC;
+
+-- ============================================================================
+-- QUERY 8: USER RISK PROFILING - Identify Suspicious User Accounts
+-- ============================================================================
+-- user_id is finer than the cube grain, so this query reads the raw table.
+
+SELECT
+    user_id,
+    SUM(CASE WHEN fraud = 'YES' THEN 1 ELSE 0 END) AS fraud_incidents,
+    SUM(CASE WHEN fraud = 'NO' THEN 1 ELSE 0 END) AS legitimate_transactions,
+    ROUND(100.0 * SUM(CASE WHEN fraud = 'YES' THEN 1 ELSE 0 END) / COUNT(*), 2) AS fraud_rate_percent,
+    ROUND(SUM(CASE WHEN fraud = 'YES' THEN amount ELSE 0 END), 2) AS fraud_amount_by_user,
+    ROUND(AVG(amount), 2) AS avg_transaction_value
+FROM credit.cleaned_fraud
+GROUP BY user_id
+HAVING SUM(CASE WHEN fraud = 'YES' THEN 1 ELSE 0 END) > 0
+ORDER BY fraud_incidents DESC
+LIMIT 20;
+
+-- ============================================================================
+-- QUERY 9: TEMPORAL FRAUD PATTERNS - Hourly Risk Analysis
+-- ============================================================================
+-- FLOOR(time / 3600) is rebuilt from the cube as day * 24 + hour.
+
+SELECT
+    day * 24 + hour AS hour_of_day,
+    category,
+    SUM(CASE WHEN fraud = 'YES' THEN txn_count ELSE 0 END) AS fraud_count,
+    SUM(txn_count) AS total_transactions,
+    ROUND(100.0 * SUM(CASE WHEN fraud = 'YES' THEN txn_count ELSE 0 END) / SUM(txn_count), 2) AS fraud_rate_percent
+FROM credit.fraud_cube
+WHERE fraud = 'YES'
+GROUP BY day * 24 + hour, category
+ORDER BY hour_of_day ASC, fraud_count DESC;
+
+-- ============================================================================
+-- QUERY 10: DAILY FRAUD TRENDS - Cumulative Analysis Over Time
+-- ============================================================================
+
+SELECT
+    day AS day_number,
+    category,
+    SUM(CASE WHEN fraud = 'YES' THEN txn_count ELSE 0 END) AS fraud_incidents,
+    SUM(txn_count) AS total_transactions,
+    ROUND(SUM(CASE WHEN fraud = 'YES' THEN amount_sum ELSE 0 END), 2) AS fraud_amount,
+    ROUND(SUM(amount_sum) / SUM(amount_count), 2) AS avg_transaction_amount
+FROM credit.fraud_cube
+GROUP BY day, category
+ORDER BY fraud_incidents DESC
+LIMIT 30;
+
+-- ============================================================================
+-- QUERY 11: CATEGORY-DEVICE FRAUD ANALYSIS - Device Risk Segmentation
+-- ============================================================================
+-- device_id is finer than the cube grain, so this query reads the raw table.
+
+SELECT
+    device_id,
+    category,
+    SUM(CASE WHEN fraud = 'YES' THEN 1 ELSE 0 END) AS fraud_count,
+    COUNT(*) AS total_transactions,
+    ROUND(100.0 * SUM(CASE WHEN fraud = 'YES' THEN 1 ELSE 0 END) / COUNT(*), 2) AS fraud_rate_percent,
+    ROUND(AVG(amount), 2) AS avg_transaction_amount
+FROM credit.cleaned_fraud
+GROUP BY device_id, category
+HAVING SUM(CASE WHEN fraud = 'YES' THEN 1 ELSE 0 END) >= 2
+ORDER BY fraud_rate_percent DESC;
+
+-- ============================================================================
+-- QUERY 12: COMPREHENSIVE FRAUD IMPACT REPORT - Business ROI Metrics
+-- ============================================================================
+
+SELECT
+    'FRAUD METRICS' AS metric_type,
+    SUM(CASE WHEN fraud = 'YES' THEN txn_count ELSE 0 END) AS fraud_count,
+    ROUND(SUM(CASE WHEN fraud = 'YES' THEN amount_sum ELSE 0 END), 2) AS total_fraud_amount,
+    ROUND(SUM(CASE WHEN fraud = 'YES' THEN amount_sum END)
+          / SUM(CASE WHEN fraud = 'YES' THEN amount_count END), 2) AS avg_fraud_value,
+    ROUND(100.0 * SUM(CASE WHEN fraud = 'YES' THEN amount_sum ELSE 0 END) / SUM(amount_sum), 2) AS fraud_percent_of_volume
+FROM credit.fraud_cube;